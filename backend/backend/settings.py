@@ -206,6 +206,10 @@ TEMPLATES = [
         "BACKEND": "django.template.backends.django.DjangoTemplates",
         "DIRS": [BASE_DIR / "templates"],
         "APP_DIRS": True,
+        # No explicit "loaders": since Django 4.1 the default already wraps
+        # the filesystem + app_directories loaders in the cached loader (in
+        # DEBUG too, reset on autoreload), so admin templates parse once per
+        # process. Setting loaders here would require dropping APP_DIRS.
         "OPTIONS": {
             "context_processors": [
                 "django.template.context_processors.debug",
@@ -243,6 +247,10 @@ if "postgresql" in db_engine:
             "PASSWORD": os.getenv("DB_PASSWORD"),
             "HOST": os.getenv("DB_HOST", "localhost"),
             "PORT": os.getenv("DB_PORT", "5432"),
+            # Persistent connections: no TCP + auth handshake per request.
+            # Set DB_CONN_MAX_AGE=0 when running behind PgBouncer.
+            "CONN_MAX_AGE": int(os.getenv("DB_CONN_MAX_AGE", "60")),
+            "CONN_HEALTH_CHECKS": True,
         }
     }
 else:
@@ -254,6 +262,22 @@ else:
     }
 
 
+# ======================================================
+# CACHE
+# ======================================================
+# Idempotency claims (cache.add) and cached API payloads must be shared by
+# every gunicorn worker: set REDIS_URL in production (needs the redis
+# package). Without it each process gets its own LocMem cache.
+REDIS_URL = os.getenv("REDIS_URL")
+if REDIS_URL:
+    CACHES = {
+        "default": {
+            "BACKEND": "django.core.cache.backends.redis.RedisCache",
+            "LOCATION": REDIS_URL,
+        }
+    }
+
+
 # ======================================================
 # AUTHENTICATION
 # ======================================================
@@ -378,6 +402,8 @@ LOGGING = {
     "disable_existing_loggers": False,
     "handlers": {
         "console": {"class": "logging.StreamHandler"},
+        # Hot paths (checkout, OTP, scheduler) log via a background thread
+        "queued_console": {"()": "core.log.queued_console_handler"},
     },
     "loggers": {
         "django": {
@@ -385,7 +411,7 @@ LOGGING = {
             "level": "INFO",
         },
         "orders": {
-            "handlers": ["console"],
+            "handlers": ["queued_console"],
             "level": "INFO",
         },
     },
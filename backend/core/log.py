@@ -0,0 +1,20 @@
+import atexit
+import logging
+import queue
+from logging.handlers import QueueHandler, QueueListener
+
+
+def queued_console_handler():
+    """
+    Console handler that never blocks the request thread.
+
+    Records are pushed onto an in-memory queue and written to stderr by a
+    background QueueListener thread (flushed on interpreter exit).
+    """
+    records = queue.SimpleQueue()
+
+    listener = QueueListener(records, logging.StreamHandler())
+    listener.start()
+    atexit.register(listener.stop)
+
+    return QueueHandler(records)
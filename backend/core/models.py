@@ -412,10 +412,14 @@ class BreakfastWindow(models.Model):
         return next_open
 
     @classmethod
-    def get_current_status(cls):
-        """Get current breakfast window status for API"""
+    def get_current_status(cls, window=None):
+        """
+        Get current breakfast window status for API.
+        Pass an already-loaded active `window` to skip the lookup query.
+        """
         try:
-            window = cls.objects.filter(is_active=True).first()
+            if window is None:
+                window = cls.objects.filter(is_active=True).first()
             if not window:
                 return {
                     "is_open": False,
@@ -0,0 +1,37 @@
+try:
+    import orjson
+except Exception:
+    orjson = None
+
+from rest_framework.renderers import JSONRenderer
+from rest_framework.utils.encoders import JSONEncoder
+
+
+# ======================================================
+# FAST JSON RENDERER (ORJSON OPTIONAL)
+# ======================================================
+class FastJSONRenderer(JSONRenderer):
+    """
+    JSONRenderer that encodes with orjson when it is installed.
+
+    Output matches the stock renderer: compact, UTF-8, and any type orjson
+    does not know natively (Decimal, lazy strings, ...) goes through DRF's
+    own JSONEncoder. Without orjson, or when an indented response is
+    requested, it simply is the stock renderer.
+    """
+
+    _fallback = JSONEncoder().default
+
+    def render(self, data, accepted_media_type=None, renderer_context=None):
+        if (
+            orjson is None
+            or data is None
+            or self.get_indent(accepted_media_type, renderer_context or {})
+        ):
+            return super().render(data, accepted_media_type, renderer_context)
+
+        ret = orjson.dumps(data, default=self._fallback)
+
+        # Same escaping as JSONRenderer: U+2028/2029 are valid JSON but
+        # break JavaScript string literals
+        return ret.replace(b"\xe2\x80\xa8", b"\\u2028").replace(b"\xe2\x80\xa9", b"\\u2029")
@@ -0,0 +1,25 @@
+import copy
+
+
+# ======================================================
+# SERIALIZER FIELD CACHE
+# ======================================================
+class SerializerCacheMixin:
+    """
+    Build a ModelSerializer's field graph ONCE per class.
+
+    DRF re-runs model introspection (`get_fields()` → `build_field()`)
+    for every serializer instance. The result depends only on the class
+    Meta, so it is built on first use and deep-copied afterwards — the
+    same way DRF already copies `_declared_fields` per instance.
+    """
+
+    def get_fields(self):
+        cls = type(self)
+        template = cls.__dict__.get("_cached_fields_template")
+
+        if template is None:
+            template = super().get_fields()
+            cls._cached_fields_template = template
+
+        return copy.deepcopy(template)
@@ -0,0 +1,28 @@
+from django.db import connection
+from django.db.migrations.executor import MigrationExecutor
+from django.test import TransactionTestCase
+
+
+class MigrationTestCase(TransactionTestCase):
+    """Migrate `app` back to `migrate_from`, seed, then run `migrate_to`."""
+
+    app = None
+    migrate_from = None
+    migrate_to = None
+
+    def setUp(self):
+        executor = MigrationExecutor(connection)
+        executor.migrate([(self.app, self.migrate_from)])
+        self.seed(executor.loader.project_state((self.app, self.migrate_from)).apps)
+
+        executor = MigrationExecutor(connection)
+        executor.loader.build_graph()
+        executor.migrate([(self.app, self.migrate_to)])
+        self.apps = executor.loader.project_state((self.app, self.migrate_to)).apps
+
+    def tearDown(self):
+        executor = MigrationExecutor(connection)
+        executor.migrate(executor.loader.graph.leaf_nodes())
+
+    def seed(self, apps):
+        pass
@@ -1,6 +1,7 @@
 from decimal import Decimal
 
 from django.contrib import admin, messages
+from django.db.models import Prefetch
 from django.shortcuts import redirect
 from django.urls import path, reverse
 from django.utils.html import format_html
@@ -323,6 +324,23 @@ class ComboAdmin(admin.ModelAdmin):
         ),
     )
 
+    # ---------------- QUERYSET ----------------
+
+    def get_queryset(self, request):
+        # total_cost / available_quantity walk items → prepared item →
+        # recipe → ingredient; load the whole tree up front instead of
+        # per combo (changelist) and per item (change form)
+        return super().get_queryset(request).prefetch_related(
+            Prefetch(
+                "items",
+                queryset=ComboItem.objects.select_related("prepared_item"),
+            ),
+            Prefetch(
+                "items__prepared_item__recipe_items",
+                queryset=PreparedItemRecipe.objects.select_related("ingredient"),
+            ),
+        )
+
     # ---------------- DISPLAY ----------------
 
     @admin.display(description="Image")
@@ -229,13 +229,15 @@ class PreparedItem(models.Model):
         Max prepared items that can be made based on ingredient stock.
         Handles both PER_SERVING and BATCH production modes.
         """
-        if not self.recipe_items.exists():
+        # Evaluated once (and served from a prefetch when there is one)
+        recipes = self.recipe_items.all()
+        if not recipes:
             return 0  # No recipe, can't make
 
         if self.production_mode == self.PER_SERVING:
             # PER_SERVING: recipe quantities are per serving
             available = 999999  # Large number for "unlimited"
-            for recipe in self.recipe_items.all():
+            for recipe in recipes:
                 required_base = recipe.ingredient.to_base_unit(
                     recipe.quantity, recipe.quantity_unit
                 )
@@ -253,7 +255,7 @@ class PreparedItem(models.Model):
                 return 0  # Batch output not specified
             
             available_batches = 999999  # Large number for "unlimited"
-            for recipe in self.recipe_items.all():
+            for recipe in recipes:
                 required_base = recipe.ingredient.to_base_unit(
                     recipe.quantity, recipe.quantity_unit
                 )
@@ -464,11 +466,12 @@ class Combo(models.Model):
         """
         Max combos that can be made based on current ingredient stock.
         """
-        if not self.items.exists():
+        items = self.items.all()
+        if not items:
             return 0
 
         available = 999999  # Large number for "unlimited"
-        for item in self.items.all():
+        for item in items:
             prepared_available = item.prepared_item.get_available_quantity()
             if prepared_available == 0:
                 return 0
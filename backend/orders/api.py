@@ -1,29 +1,72 @@
 import logging
 import uuid
+from decimal import Decimal
 
 from django.conf import settings
 from django.db import transaction
-from django.db.models import Prefetch
+from django.core.exceptions import ValidationError
+from django.db.models import OuterRef, Prefetch, Subquery, Sum, Value
+from django.db.models.functions import Coalesce
 from django.utils.timezone import now
 
 from rest_framework import status
 from rest_framework.decorators import action
-from rest_framework.permissions import AllowAny
+from rest_framework.pagination import PageNumberPagination
+from rest_framework.permissions import AllowAny, IsAdminUser
 from rest_framework.response import Response
 from rest_framework.viewsets import ModelViewSet
 
-from .models import Order, OrderItem
+from .models import ORDER_STATUSES, ORDER_STATUS_TRANSITIONS, Order, OrderCombo, OrderEvent, OrderItem
 from .serializers import (
     OrderReadSerializer,
+    OrderListSerializer,
     OrderCreateSerializer,
     OrderConfirmationSerializer,
 )
-from orders.services import confirm_order, cancel_order
+from orders.services import (
+    OrderInProgress,
+    cancel_order,
+    check_scheduled_orders,
+    confirm_order,
+    prepare_order,
+    process_scheduled_orders,
+    release_idempotency_claims,
+)
 from orders.personalization import personalization_service
+from accounts.models import Customer
+from core.utils import get_store_status, next_opening_datetime
+from menu.models import Combo, PreparedItem
 
 logger = logging.getLogger(__name__)
 
 
+def _quantity_total(model):
+    """SUM(quantity) of `model` rows for the outer order, 0 when none."""
+    return Coalesce(
+        Subquery(
+            model.objects
+            .filter(order=OuterRef("pk"))
+            .values("order")
+            .annotate(total=Sum("quantity"))
+            .values("total")
+        ),
+        Value(0),
+    )
+
+VALID_STATUS_OPTIONS = ", ".join(value for value, _ in Order.STATUS_CHOICES)
+
+
+def order_in_progress_response():
+    """Double-submit while the first checkout with the same key is running."""
+    return Response(
+        {
+            "error": "This order is already being placed. "
+                     "Please wait a few seconds and check your orders before retrying.",
+        },
+        status=status.HTTP_409_CONFLICT,
+    )
+
+
 # ======================================================
 # TEMP ROLE RESOLUTION (REPLACE WITH AUTH LATER)
 # ======================================================
@@ -31,6 +74,15 @@ def get_role(request):
     return request.headers.get("X-ROLE", "public")
 
 
+# ======================================================
+# PAGINATION
+# ======================================================
+class OrderPagination(PageNumberPagination):
+    page_size = 20
+    page_size_query_param = "page_size"
+    max_page_size = 100
+
+
 # ======================================================
 # ORDER API — SINGLE SOURCE OF TRUTH
 # ======================================================
@@ -47,21 +99,50 @@ class OrderViewSet(ModelViewSet):
 
     permission_classes = [AllowAny]
     http_method_names = ["get", "post", "head", "options"]
+    pagination_class = OrderPagination
 
-    queryset = (
-        Order.objects
-        .all()
-        .order_by("-created_at")
-        .prefetch_related(
-            Prefetch(
-                "order_items",
-                queryset=OrderItem.objects.select_related("prepared_item")
-            ),
-            "order_combos__combo",
-            "order_snacks",
-            "events",
-        )
-    )
+    queryset = Order.objects.all().order_by("-created_at")
+
+    # --------------------------------------------------
+    # QUERYSET (PREFETCH ONLY WHERE NESTED DATA IS READ)
+    # --------------------------------------------------
+    def get_queryset(self):
+        qs = super().get_queryset()
+
+        if self.action == "retrieve":
+            return qs.select_related("customer").prefetch_related(
+                Prefetch(
+                    "order_items",
+                    queryset=OrderItem.objects.select_related("prepared_item")
+                ),
+                "order_combos__combo",
+                "order_snacks",
+                "order_addons",
+                "events",
+            )
+
+        if self.action == "kitchen":
+            return qs.prefetch_related(
+                Prefetch(
+                    "order_items",
+                    queryset=OrderItem.objects.select_related("prepared_item")
+                ),
+            )
+
+        if self.action == "status":
+            # Polling endpoint — scalar columns only
+            return qs.only("id", "status", "eta_minutes", "created_at")
+
+        if self.action == "summary":
+            # Quantities are summed in SQL (one correlated subquery per
+            # relation, so the two joins can't fan out each other's rows)
+            return qs.annotate(
+                items_qty=_quantity_total(OrderItem),
+                combos_qty=_quantity_total(OrderCombo),
+            )
+
+        # list / by_status: slim list shape, no nested rows to prefetch
+        return qs
 
     # --------------------------------------------------
     # SERIALIZER SELECTION
@@ -69,6 +150,8 @@ class OrderViewSet(ModelViewSet):
     def get_serializer_class(self):
         if self.action == "create":
             return OrderCreateSerializer
+        if self.action in ("list", "by_status"):
+            return OrderListSerializer
         return OrderReadSerializer
 
     # --------------------------------------------------
@@ -97,8 +180,13 @@ class OrderViewSet(ModelViewSet):
             )
 
         try:
-            order = serializer.save()
+            serializer.save(
+                idempotency_key=request.headers.get("X-Idempotency-Key"),
+            )
+        except OrderInProgress:
+            return order_in_progress_response()
         except Exception as e:
+            release_idempotency_claims()
             logger.exception("Order creation failed")
             # Never show system errors to customers
             return Response(
@@ -106,10 +194,48 @@ class OrderViewSet(ModelViewSet):
                 status=status.HTTP_500_INTERNAL_SERVER_ERROR,
             )
 
-        return Response(
-            OrderConfirmationSerializer(order).data,
-            status=status.HTTP_201_CREATED,
-        )
+        return Response(serializer.data, status=status.HTTP_201_CREATED)
+
+    # --------------------------------------------------
+    # BULK CREATE (POS / MULTI-TERMINAL)
+    # --------------------------------------------------
+    @action(detail=False, methods=["post"])
+    def bulk(self, request):
+        """
+        Create several orders in ONE request and ONE transaction.
+
+        Body is a list of normal create payloads. All-or-nothing: if any
+        order fails, none are placed.
+        """
+        if not isinstance(request.data, list) or not request.data:
+            return Response(
+                {"error": "Expected a non-empty list of orders"},
+                status=status.HTTP_400_BAD_REQUEST,
+            )
+
+        serializer = OrderCreateSerializer(data=request.data, many=True)
+        if not serializer.is_valid():
+            return Response(
+                {"errors": serializer.errors},
+                status=status.HTTP_400_BAD_REQUEST,
+            )
+
+        try:
+            with transaction.atomic():
+                serializer.save()
+        except OrderInProgress:
+            release_idempotency_claims()
+            return order_in_progress_response()
+        except Exception:
+            # Orders placed earlier in the batch were rolled back too
+            release_idempotency_claims()
+            logger.exception("Bulk order creation failed")
+            return Response(
+                {"error": "Unable to process orders. Please try again or contact support."},
+                status=status.HTTP_500_INTERNAL_SERVER_ERROR,
+            )
+
+        return Response(serializer.data, status=status.HTTP_201_CREATED)
 
     # --------------------------------------------------
     # CONFIRM ORDER (ADMIN / SYSTEM)
@@ -214,7 +340,7 @@ class OrderViewSet(ModelViewSet):
                         "name": i.prepared_item.name,
                         "quantity": i.quantity,
                     }
-                    for i in o.items.all()
+                    for i in o.order_items.all()
                 ],
             }
             for o in orders
@@ -233,18 +359,98 @@ class OrderViewSet(ModelViewSet):
         if status_param:
             qs = qs.filter(status=status_param)
 
-        return Response(
-            OrderReadSerializer(qs, many=True).data
+        page = self.paginate_queryset(qs)
+        return self.get_paginated_response(
+            self.get_serializer(page, many=True).data
         )
 
+    # --------------------------------------------------
+    # ORDER SUMMARY (LIGHTWEIGHT, STAFF)
+    # --------------------------------------------------
+    # Staff auth here and on the scheduled/prepare actions below: the
+    # client-set X-ROLE header is not authentication
+    @action(detail=True, methods=["get"], permission_classes=[IsAdminUser])
+    def summary(self, request, pk=None):
+        order = self.get_object()
+
+        return Response({
+            "order_id": order.id,
+            "order_number": order.order_number,
+            "status": order.status,
+            "status_display": order.get_status_display(),
+            "created_at": order.created_at,
+            "total_amount": order.total_amount,
+            "total_items": order.items_qty + order.combos_qty,
+        })
+
+    # --------------------------------------------------
+    # PROCESS SCHEDULED ORDERS (STAFF)
+    # --------------------------------------------------
+    @action(detail=False, methods=["post"], permission_classes=[IsAdminUser])
+    def process_scheduled(self, request):
+        """Process all scheduled orders that are ready for preparation"""
+        try:
+            process_scheduled_orders()
+        except Exception:
+            logger.exception("Processing scheduled orders failed")
+            return Response(
+                {"error": "Failed to process scheduled orders"},
+                status=status.HTTP_500_INTERNAL_SERVER_ERROR,
+            )
+
+        return Response({"message": "Scheduled orders processed successfully"})
+
+    # --------------------------------------------------
+    # CHECK SCHEDULED ORDERS (STAFF)
+    # --------------------------------------------------
+    @action(detail=False, methods=["get"], permission_classes=[IsAdminUser])
+    def scheduled_status(self, request):
+        """Get status of scheduled orders"""
+        # One query, only the serialized columns, no model hydration
+        rows = list(
+            check_scheduled_orders().values(
+                "id",
+                "order_number",
+                "scheduled_for",
+                "customer_name",
+                "total_amount",
+            )
+        )
+        return Response({
+            "ready_count": len(rows),
+            "orders": [
+                {**row, "id": str(row["id"]), "total_amount": str(row["total_amount"])}
+                for row in rows
+            ]
+        })
+
+    # --------------------------------------------------
+    # PREPARE ORDER (KITCHEN STAFF)
+    # --------------------------------------------------
+    @action(detail=True, methods=["post"], permission_classes=[IsAdminUser])
+    def prepare(self, request, pk=None):
+        """Manually start preparation for a confirmed order"""
+        try:
+            with transaction.atomic():
+                # Row lock: a double-tap can't deduct stock twice
+                order = Order.objects.select_for_update().get(pk=pk)
+                prepare_order(order)
+        except Order.DoesNotExist:
+            return Response({"error": "Order not found"}, status=404)
+        except ValidationError as e:
+            return Response(
+                {"error": str(e)},
+                status=status.HTTP_400_BAD_REQUEST,
+            )
+
+        return Response(OrderReadSerializer(order).data)
+
     # --------------------------------------------------
     # STORE STATUS (TIMING INFO FOR FRONTEND)
     # --------------------------------------------------
     @action(detail=False, methods=["get"])
     def store_status(self, request):
         """Get current store status for frontend timing display"""
-        from core.utils import get_store_status, next_opening_datetime
-        
         try:
             status = get_store_status()
             
@@ -281,8 +487,6 @@ class OrderViewSet(ModelViewSet):
     @action(detail=False, methods=["post"])
     def preview(self, request):
         """Preview order with detailed breakdown before creation"""
-        from orders.serializers import OrderCreateSerializer
-        
         serializer = OrderCreateSerializer(data=request.data)
         if not serializer.is_valid():
             return Response(serializer.errors, status=status.HTTP_400_BAD_REQUEST)
@@ -297,9 +501,6 @@ class OrderViewSet(ModelViewSet):
 
     def _calculate_order_preview(self, data):
         """Calculate detailed order preview"""
-        from menu.models import Combo, PreparedItem
-        from decimal import Decimal
-        
         combos_data = []
         total_amount = Decimal('0.00')
         
@@ -394,14 +595,6 @@ class OrderViewSet(ModelViewSet):
         if get_role(request) not in ("admin", "system"):
             return Response({"error": "Forbidden"}, status=status.HTTP_403_FORBIDDEN)
 
-        try:
-            order = Order.objects.get(pk=pk)
-        except Order.DoesNotExist:
-            return Response(
-                {"error": "Order not found"},
-                status=status.HTTP_404_NOT_FOUND,
-            )
-
         new_status = request.data.get("status")
         note = request.data.get("note", "")
 
@@ -412,23 +605,38 @@ class OrderViewSet(ModelViewSet):
             )
 
         # Validate status transition
-        valid_statuses = [choice[0] for choice in Order.STATUS_CHOICES]
-        if new_status not in valid_statuses:
+        if new_status not in ORDER_STATUSES:
             return Response(
-                {"error": f"Invalid status. Valid options: {', '.join(valid_statuses)}"},
+                {"error": f"Invalid status. Valid options: {VALID_STATUS_OPTIONS}"},
                 status=status.HTTP_400_BAD_REQUEST,
             )
 
-        # Update status and create event
-        old_status = order.status
-        order.status = new_status
-        order.save(update_fields=["status"])
-
-        OrderEvent.objects.create(
-            order=order,
-            action=new_status,
-            note=note or f"Status changed from {old_status} to {new_status}"
-        )
+        with transaction.atomic():
+            # Row lock: read-old-status → write happens as one unit
+            try:
+                order = Order.objects.select_for_update().get(pk=pk)
+            except Order.DoesNotExist:
+                return Response(
+                    {"error": "Order not found"},
+                    status=status.HTTP_404_NOT_FOUND,
+                )
+
+            if new_status not in ORDER_STATUS_TRANSITIONS.get(order.status, frozenset()):
+                return Response(
+                    {"error": f"Cannot change status from {order.status} to {new_status}"},
+                    status=status.HTTP_400_BAD_REQUEST,
+                )
+
+            # Update status and create event
+            old_status = order.status
+            order.status = new_status
+            order.save(update_fields=["status"])
+
+            OrderEvent.objects.create(
+                order=order,
+                action=new_status,
+                note=note or f"Status changed from {old_status} to {new_status}"
+            )
 
         return Response(OrderConfirmationSerializer(order).data)
 
@@ -450,7 +658,6 @@ class OrderViewSet(ModelViewSet):
         if not customer:
             phone = request.query_params.get('phone')
             if phone:
-                from accounts.models import Customer
                 try:
                     customer = Customer.objects.get(phone=phone)
                 except Customer.DoesNotExist:
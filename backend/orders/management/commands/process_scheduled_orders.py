@@ -21,7 +21,11 @@ class Command(BaseCommand):
                     f'Found {scheduled_orders.count()} scheduled orders ready for processing'
                 )
             )
-            for order in scheduled_orders:
+            for order in (
+                scheduled_orders
+                .only("order_number", "scheduled_for")
+                .iterator(chunk_size=500)
+            ):
                 self.stdout.write(
                     f'  Order {order.order_number}: scheduled for {order.scheduled_for}'
                 )
@@ -0,0 +1,18 @@
+# Generated by Django 5.2 on 2026-10-15 22:36
+
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('accounts', '0014_customer_preferences'),
+        ('orders', '0015_order_is_scheduled_order_scheduled_for_orderaddon'),
+    ]
+
+    operations = [
+        migrations.AddIndex(
+            model_name='order',
+            index=models.Index(condition=models.Q(('is_scheduled', True), ('status', 'placed')), fields=['scheduled_for'], name='ord_sched_idx'),
+        ),
+    ]
@@ -0,0 +1,29 @@
+# Generated by Django 5.2 on 2026-10-15 22:39
+
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('orders', '0016_order_scheduled_index'),
+    ]
+
+    operations = [
+        migrations.AddConstraint(
+            model_name='orderaddon',
+            constraint=models.UniqueConstraint(condition=models.Q(('order_item_type', 'global')), fields=('order', 'addon_name'), name='uniq_addon_per_order_global'),
+        ),
+        migrations.AddConstraint(
+            model_name='orderaddon',
+            constraint=models.UniqueConstraint(condition=models.Q(('order_item_type', 'combo')), fields=('order', 'combo_id', 'addon_name'), name='uniq_addon_per_order_combo'),
+        ),
+        migrations.AddConstraint(
+            model_name='orderaddon',
+            constraint=models.UniqueConstraint(condition=models.Q(('order_item_type', 'item')), fields=('order', 'prepared_item_id', 'addon_name'), name='uniq_addon_per_order_item'),
+        ),
+        migrations.AddConstraint(
+            model_name='orderaddon',
+            constraint=models.UniqueConstraint(condition=models.Q(('order_item_type', 'snack')), fields=('order', 'snack_id', 'addon_name'), name='uniq_addon_per_order_snack'),
+        ),
+    ]
@@ -0,0 +1,18 @@
+# Generated by Django 5.2 on 2026-10-15 22:41
+
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('accounts', '0014_customer_preferences'),
+        ('orders', '0017_orderaddon_unique_per_order'),
+    ]
+
+    operations = [
+        migrations.AddIndex(
+            model_name='order',
+            index=models.Index(fields=['customer_phone', '-created_at'], name='orders_phone_created_idx'),
+        ),
+    ]
@@ -0,0 +1,46 @@
+# Generated by Django 5.2 on 2026-10-15 22:44
+
+import json
+
+import django.db.models.fields.json
+from django.db import migrations, models
+
+
+def dedupe_idempotency_keys(apps, schema_editor):
+    """Keep each key on its earliest order; later duplicates lose the key."""
+    Order = apps.get_model("orders", "Order")
+    seen = set()
+    stale = []
+    for order in (
+        Order.objects.filter(metadata__has_key="idempotency_key")
+        .order_by("created_at", "pk")
+        .only("pk", "metadata")
+        .iterator()
+    ):
+        value = order.metadata["idempotency_key"]
+        if value is None:
+            continue  # ->> gives NULL, which the constraint never compares
+        # Compare as the index does: metadata->>'idempotency_key' text
+        key = value if isinstance(value, str) else json.dumps(value)
+        if key in seen:
+            del order.metadata["idempotency_key"]
+            stale.append(order)
+        seen.add(key)
+    if stale:
+        Order.objects.bulk_update(stale, ["metadata"], batch_size=500)
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('accounts', '0014_customer_preferences'),
+        ('orders', '0018_order_phone_created_index'),
+    ]
+
+    operations = [
+        migrations.RunPython(dedupe_idempotency_keys, migrations.RunPython.noop),
+        migrations.AddConstraint(
+            model_name='order',
+            constraint=models.UniqueConstraint(django.db.models.fields.json.KeyTextTransform('idempotency_key', 'metadata'), condition=models.Q(('metadata__has_key', 'idempotency_key')), name='orders_idem_key'),
+        ),
+    ]
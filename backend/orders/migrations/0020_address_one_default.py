@@ -0,0 +1,36 @@
+# Generated by Django 5.2 on 2026-10-15 22:45
+
+from django.db import migrations, models
+
+
+def dedupe_default_addresses(apps, schema_editor):
+    """Keep only the newest default address per customer."""
+    Address = apps.get_model("orders", "Address")
+    seen = set()
+    stale = []
+    for pk, customer_id in (
+        Address.objects.filter(is_default=True)
+        .order_by("customer_id", "-created_at", "-pk")
+        .values_list("pk", "customer_id")
+    ):
+        if customer_id in seen:
+            stale.append(pk)
+        seen.add(customer_id)
+    if stale:
+        Address.objects.filter(pk__in=stale).update(is_default=False)
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('accounts', '0014_customer_preferences'),
+        ('orders', '0019_order_idempotency_key_unique'),
+    ]
+
+    operations = [
+        migrations.RunPython(dedupe_default_addresses, migrations.RunPython.noop),
+        migrations.AddConstraint(
+            model_name='address',
+            constraint=models.UniqueConstraint(condition=models.Q(('is_default', True)), fields=('customer',), name='one_default_addr'),
+        ),
+    ]
@@ -2,6 +2,8 @@ from decimal import Decimal
 import uuid
 
 from django.db import models
+from django.db.models.fields.json import KeyTextTransform
+from django.db.models.lookups import Exact
 from django.core.validators import MinValueValidator
 from django.core.exceptions import ValidationError
 
@@ -186,6 +188,27 @@ class Order(models.Model):
         ordering = ["-created_at"]
         indexes = [
             models.Index(fields=["status", "created_at"]),
+            # "My Orders" lookup (search_orders): newest 20 for one phone
+            models.Index(
+                fields=["customer_phone", "-created_at"],
+                name="orders_phone_created_idx",
+            ),
+            # Scheduler probe (check_scheduled_orders): only due candidates
+            # are indexed, so each tick is a range scan on scheduled_for.
+            models.Index(
+                fields=["scheduled_for"],
+                name="ord_sched_idx",
+                condition=models.Q(is_scheduled=True, status="placed"),
+            ),
+        ]
+        constraints = [
+            # Idempotent checkout: one order per client key, served by an
+            # expression index on metadata->>'idempotency_key'
+            models.UniqueConstraint(
+                KeyTextTransform("idempotency_key", "metadata"),
+                condition=models.Q(metadata__has_key="idempotency_key"),
+                name="orders_idem_key",
+            ),
         ]
 
     def __str__(self):
@@ -320,10 +343,40 @@ class Order(models.Model):
     # =============================
     # FLAGS
     # =============================
+    @classmethod
+    def find_by_idempotency_key(cls, key):
+        """Indexed probe (orders_idem_key) for an already placed order."""
+        # Plain Exact on the same expression the index is built on; the
+        # metadata__idempotency_key lookup compares JSON values and
+        # cannot use it.
+        return (
+            cls.objects
+            .filter(
+                Exact(KeyTextTransform("idempotency_key", "metadata"), key),
+                metadata__has_key="idempotency_key",
+            )
+            .first()
+        )
+
     @property
     def is_pending(self):
         return self.status == self.STATUS_PENDING
 
+# =============================
+# STATUS LOOKUPS (BUILT ONCE AT IMPORT)
+# =============================
+ORDER_STATUSES = frozenset(value for value, _ in Order.STATUS_CHOICES)
+
+ORDER_STATUS_TRANSITIONS = {
+    Order.STATUS_PLACED: frozenset((Order.STATUS_CONFIRMED, Order.STATUS_CANCELLED)),
+    Order.STATUS_CONFIRMED: frozenset((Order.STATUS_PREPARING, Order.STATUS_CANCELLED)),
+    Order.STATUS_PREPARING: frozenset((Order.STATUS_OUT_FOR_DELIVERY, Order.STATUS_CANCELLED)),
+    Order.STATUS_OUT_FOR_DELIVERY: frozenset((Order.STATUS_DELIVERED,)),
+    Order.STATUS_DELIVERED: frozenset(),  # Final state
+    Order.STATUS_CANCELLED: frozenset(),  # Final state
+}
+
+
 class OrderAddon(models.Model):
     """
     Addons for order items (extra toppings, customizations, etc.)
@@ -362,6 +415,30 @@ class OrderAddon(models.Model):
 
     class Meta:
         indexes = [models.Index(fields=["order"])]
+        # One row per addon per parent item. Only the parent id column of
+        # the row's own type is set, hence one partial constraint per type.
+        constraints = [
+            models.UniqueConstraint(
+                fields=["order", "addon_name"],
+                condition=models.Q(order_item_type="global"),
+                name="uniq_addon_per_order_global",
+            ),
+            models.UniqueConstraint(
+                fields=["order", "combo_id", "addon_name"],
+                condition=models.Q(order_item_type="combo"),
+                name="uniq_addon_per_order_combo",
+            ),
+            models.UniqueConstraint(
+                fields=["order", "prepared_item_id", "addon_name"],
+                condition=models.Q(order_item_type="item"),
+                name="uniq_addon_per_order_item",
+            ),
+            models.UniqueConstraint(
+                fields=["order", "snack_id", "addon_name"],
+                condition=models.Q(order_item_type="snack"),
+                name="uniq_addon_per_order_snack",
+            ),
+        ]
 
     @property
     def total_price(self):
@@ -535,6 +612,15 @@ class Address(models.Model):
 
     created_at = models.DateTimeField(auto_now_add=True)
 
+    class Meta:
+        constraints = [
+            models.UniqueConstraint(
+                fields=["customer"],
+                condition=models.Q(is_default=True),
+                name="one_default_addr",
+            ),
+        ]
+
 class OrderEvent(models.Model):
     order = models.ForeignKey(
         Order,
@@ -171,7 +171,7 @@ class PersonalizationService:
                         'reason': f"You've ordered this {frequency} time{'s' if frequency > 1 else ''} in the {current_time_slot}",
                         'confidence': min(100, frequency * 20),  # Scale confidence
                         'time_based': True,
-                        'image_url': combo.image.url if combo.image else None,
+                        'image_url': combo.image_url,
                     }
                     suggestions.append(suggestion)
                 except Combo.DoesNotExist:
@@ -203,7 +203,7 @@ class PersonalizationService:
                         'reason': f"Your favorite - ordered {frequency} time{'s' if frequency > 1 else ''}",
                         'confidence': min(100, frequency * 15),
                         'time_based': False,
-                        'image_url': combo.image.url if combo.image else None,
+                        'image_url': combo.image_url,
                     }
                     suggestions.append(suggestion)
                 except Combo.DoesNotExist:
@@ -1,6 +1,9 @@
+import re
+
 from rest_framework import serializers
 from django.conf import settings
-from django.db import transaction
+from django.db import models, transaction
+from django.db.models import Prefetch, prefetch_related_objects
 from django.core.exceptions import ValidationError
 
 from .models import (
@@ -14,15 +17,16 @@ from .models import (
     CartLine,
 )
 
+from core.serializers import SerializerCacheMixin
 from snacks.models import Snack
-from orders.services import create_order_from_normalized_payload
+from orders.services import OrderInProgress, create_order_from_normalized_payload
 
 
 # ======================================================
 # ORDER — READ SERIALIZERS
 # ======================================================
 
-class OrderItemReadSerializer(serializers.ModelSerializer):
+class OrderItemReadSerializer(SerializerCacheMixin, serializers.ModelSerializer):
     name = serializers.CharField(
         source="prepared_item.name",
         read_only=True
@@ -37,7 +41,7 @@ class OrderItemReadSerializer(serializers.ModelSerializer):
         )
 
 
-class OrderComboReadSerializer(serializers.ModelSerializer):
+class OrderComboReadSerializer(SerializerCacheMixin, serializers.ModelSerializer):
     name = serializers.CharField(
         source="combo.name",
         read_only=True
@@ -52,7 +56,7 @@ class OrderComboReadSerializer(serializers.ModelSerializer):
         )
 
 
-class OrderSnackReadSerializer(serializers.ModelSerializer):
+class OrderSnackReadSerializer(SerializerCacheMixin, serializers.ModelSerializer):
     class Meta:
         model = OrderSnack
         fields = (
@@ -63,7 +67,7 @@ class OrderSnackReadSerializer(serializers.ModelSerializer):
         )
 
 
-class OrderAddonReadSerializer(serializers.ModelSerializer):
+class OrderAddonReadSerializer(SerializerCacheMixin, serializers.ModelSerializer):
     class Meta:
         model = OrderAddon
         fields = (
@@ -78,7 +82,7 @@ class OrderAddonReadSerializer(serializers.ModelSerializer):
         )
 
 
-class OrderEventReadSerializer(serializers.ModelSerializer):
+class OrderEventReadSerializer(SerializerCacheMixin, serializers.ModelSerializer):
     action_display = serializers.SerializerMethodField()
 
     class Meta:
@@ -103,7 +107,16 @@ class OrderEventReadSerializer(serializers.ModelSerializer):
         return action_display_map.get(obj.action, obj.action.title())
 
 
-class OrderReadSerializer(serializers.ModelSerializer):
+class OrderReadListSerializer(serializers.ListSerializer):
+    """many=True wrapper: binds the child's to_representation once per list."""
+
+    def to_representation(self, data):
+        iterable = data.all() if isinstance(data, models.manager.BaseManager) else data
+        child_to_representation = self.child.to_representation
+        return [child_to_representation(item) for item in iterable]
+
+
+class OrderReadSerializer(SerializerCacheMixin, serializers.ModelSerializer):
     """
     Canonical read serializer.
     Used by:
@@ -160,6 +173,7 @@ class OrderReadSerializer(serializers.ModelSerializer):
             "total_items",
             "events",
         )
+        list_serializer_class = OrderReadListSerializer
 
     def get_total_items(self, obj):
         return (
@@ -173,11 +187,36 @@ class OrderReadSerializer(serializers.ModelSerializer):
         return obj.customer and obj.customer.user is not None
 
 
+class OrderListSerializer(serializers.ModelSerializer):
+    """
+    Slim list shape (no nested rows).
+    Used by:
+    - Order list
+    - Ops / dashboard status filters
+    """
+
+    status_display = serializers.CharField(
+        source="get_status_display",
+        read_only=True
+    )
+
+    class Meta:
+        model = Order
+        fields = (
+            "id",
+            "order_number",
+            "status",
+            "status_display",
+            "total_amount",
+            "created_at",
+        )
+
+
 # ======================================================
 # ORDER CONFIRMATION
 # ======================================================
 
-class OrderConfirmationSerializer(serializers.ModelSerializer):
+class OrderConfirmationSerializer(SerializerCacheMixin, serializers.ModelSerializer):
     """
     Enhanced order confirmation response with all details for instant trust.
     """
@@ -235,7 +274,8 @@ class OrderConfirmationSerializer(serializers.ModelSerializer):
 
     def get_timeline(self, obj):
         """Generate order tracking timeline"""
-        events = obj.events.all().order_by('created_at')
+        # OrderEvent.Meta orders by created_at; keeps a prefetch usable
+        events = obj.events.all()
 
         # Define status progression with descriptions
         status_progression = {
@@ -399,25 +439,49 @@ class OrderCreateSerializer(serializers.Serializer):
     @transaction.atomic
     def create(self, validated_data):
         """Create order using normalized payload"""
-        from orders.services import create_order_from_normalized_payload
-
         payload = {
             "order": validated_data["order"],
             "order_items": validated_data["order_items"],
-            "order_addons": validated_data.get("order_addons", [])
+            "order_addons": validated_data.get("order_addons", []),
+            # Passed via serializer.save(idempotency_key=...)
+            "idempotency_key": validated_data.get("idempotency_key"),
         }
 
         try:
             return create_order_from_normalized_payload(payload)
+        except OrderInProgress:
+            # Not a payload problem; the view answers 409
+            raise
         except ValidationError as e:
             raise serializers.ValidationError(str(e))
 
+    def to_representation(self, instance):
+        """
+        Created orders are returned in the confirmation shape, so views can
+        respond with `serializer.data` instead of a second serializer pass.
+        """
+        prefetch_related_objects(
+            [instance],
+            "customer__user",
+            Prefetch(
+                "order_items",
+                queryset=OrderItem.objects.select_related("prepared_item"),
+            ),
+            "order_combos__combo",
+            "order_snacks",
+            "order_addons",
+            "events",
+        )
+        return OrderConfirmationSerializer(
+            instance, context=self.context
+        ).to_representation(instance)
+
 
 # ======================================================
 # CART SERIALIZERS (EPHEMERAL)
 # ======================================================
 
-class CartLineSerializer(serializers.ModelSerializer):
+class CartLineSerializer(SerializerCacheMixin, serializers.ModelSerializer):
     class Meta:
         model = CartLine
         fields = (
@@ -432,7 +496,7 @@ class CartLineSerializer(serializers.ModelSerializer):
         )
 
 
-class CartSerializer(serializers.ModelSerializer):
+class CartSerializer(SerializerCacheMixin, serializers.ModelSerializer):
     lines = CartLineSerializer(many=True)
 
     class Meta:
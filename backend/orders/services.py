@@ -1,8 +1,16 @@
+from abc import ABC, abstractmethod
+from datetime import timedelta
 from decimal import Decimal
+from functools import partial
+import logging
+import random
 import re
-from uuid import UUID
+import threading
 
-from django.db import transaction
+from django.core.cache import cache
+from django.db import IntegrityError, transaction
+from django.db.models import DateTimeField, F, Value
+from django.db.models.functions import Coalesce, Greatest, Least
 from django.core.exceptions import ValidationError
 from django.utils import timezone
 
@@ -17,11 +25,25 @@ from orders.models import (
 from menu.models import Combo, PreparedItem
 from snacks.models import Snack
 from ingredients.models import Ingredient
-from accounts.models import Customer
+from accounts.models import OTP, Customer
 from accounts.sms import send_sms
+from core.utils import next_opening_datetime, store_runtime_status
+from orders.tasks import process_one_scheduled_order
+
+logger = logging.getLogger(__name__)
 
 ZERO = Decimal("0.00")
 PHONE_RE = re.compile(r"^\+?[0-9]{6,15}$")
+CART_CACHE_TIMEOUT = 60 * 5
+
+IDEMPOTENCY_PENDING = "pending"
+IDEMPOTENCY_CLAIM_TIMEOUT = 60
+IDEMPOTENCY_TIMEOUT = 60 * 60
+
+
+class OrderInProgress(ValidationError):
+    """A checkout with the same idempotency key has not finished yet."""
+
 
 # ======================================================
 # LEGACY FUNCTIONS (DEPRECATED)
@@ -30,6 +52,137 @@ PHONE_RE = re.compile(r"^\+?[0-9]{6,15}$")
 # Old create_order_from_payload function removed - use create_order_from_normalized_payload
 
 
+# ======================================================
+# ORDER ITEM HANDLERS (ONE PER order_items[].type)
+# ======================================================
+
+class ItemHandler(ABC):
+    """
+    Checkout behaviour for one `order_items[].type`.
+
+    Adding a new sellable type (e.g. "beverage") means adding a handler
+    to ITEM_HANDLERS — the checkout functions below never change.
+    """
+
+    model = None
+
+    def coerce_id(self, raw_id):
+        return self.model._meta.pk.to_python(raw_id)
+
+    def bulk_fetch(self, ids, active_only: bool = False) -> dict:
+        """Load all referenced rows of this type in ONE query."""
+        qs = self.model.objects.filter(pk__in=ids)
+        if active_only:
+            qs = qs.filter(is_active=True)
+        return qs.in_bulk()
+
+    def price(self, obj, quantity) -> Decimal:
+        return obj.selling_price * quantity
+
+    @abstractmethod
+    def build_row(self, order: Order, obj, quantity):
+        """Unsaved order line row for `obj` × `quantity`."""
+
+    @abstractmethod
+    def addon_parent(self, obj) -> dict:
+        """OrderAddon kwargs pointing at the parent line item."""
+
+
+class ComboHandler(ItemHandler):
+    model = Combo
+
+    def build_row(self, order, obj, quantity):
+        return OrderCombo(order=order, combo=obj, quantity=quantity)
+
+    def addon_parent(self, obj):
+        return {"combo_id": obj.pk}
+
+
+class PreparedItemHandler(ItemHandler):
+    model = PreparedItem
+
+    def price(self, obj, quantity):
+        # Note: PreparedItem doesn't have selling_price, need to calculate from recipes
+        # For now, assume it's available
+        return ZERO
+
+    def build_row(self, order, obj, quantity):
+        return OrderItem(order=order, prepared_item=obj, quantity=quantity)
+
+    def addon_parent(self, obj):
+        return {"prepared_item_id": obj.pk}
+
+
+class SnackHandler(ItemHandler):
+    model = Snack
+
+    def build_row(self, order, obj, quantity):
+        return OrderSnack(
+            order=order,
+            snack_id=obj.id,
+            snack_name=obj.name,
+            quantity=quantity,
+            unit_price=obj.selling_price
+        )
+
+    def addon_parent(self, obj):
+        return {"snack_id": obj.pk}
+
+
+ITEM_HANDLERS = {
+    "combo": ComboHandler(),
+    "item": PreparedItemHandler(),
+    "snack": SnackHandler(),
+}
+
+
+def fetch_order_item_objects(order_items: list, active_only: bool = False):
+    """
+    Resolve every order line to its model instance, one query per type.
+
+    Returns (objects, errors) where `objects[i]` is the instance for
+    `order_items[i]` (or None) and `errors` lists human-readable problems.
+    """
+    ids_by_type = {}
+    pks = []
+    errors = []
+
+    for item in order_items:
+        handler = ITEM_HANDLERS.get(item["type"])
+        pk = None
+        if handler is not None:
+            try:
+                pk = handler.coerce_id(item["id"])
+            except (ValueError, TypeError, ValidationError):
+                # Malformed id (e.g. not a UUID); reported below
+                pass
+            else:
+                ids_by_type.setdefault(item["type"], set()).add(pk)
+        pks.append(pk)
+
+    fetched = {
+        item_type: ITEM_HANDLERS[item_type].bulk_fetch(ids, active_only)
+        for item_type, ids in ids_by_type.items()
+    }
+
+    objects = []
+    for item, pk in zip(order_items, pks):
+        item_type = item["type"]
+        obj = None
+
+        if item_type not in ITEM_HANDLERS:
+            errors.append(f"Unknown item type: {item_type}")
+        elif pk is None:
+            errors.append(f"{item_type} {item['id']!r}: invalid id")
+        else:
+            obj = fetched[item_type].get(pk)
+            if obj is None:
+                errors.append(f"{item_type} {item['id']}: not found or inactive")
+        objects.append(obj)
+
+    return objects, errors
+
+
 def check_menu_availability(order_items: list) -> dict:
     """
     DECOUPLED: Check menu availability without affecting order placement.
@@ -41,36 +194,17 @@ def check_menu_availability(order_items: list) -> dict:
         "unavailable_items": list
     }
     """
-    from menu.models import Combo, PreparedItem
-    from snacks.models import Snack
-
     total_amount = ZERO
-    unavailable_items = []
-
-    for item in order_items:
-        item_type = item["type"]
-        item_id = item["id"]
-        quantity = item["quantity"]
+    objects, unavailable_items = fetch_order_item_objects(
+        order_items, active_only=True
+    )
 
-        try:
-            if item_type == "combo":
-                combo = Combo.objects.get(id=item_id, is_active=True)
-                total_amount += combo.selling_price * quantity
-            elif item_type == "item":
-                prepared_item = PreparedItem.objects.get(id=item_id, is_active=True)
-                # Note: PreparedItem doesn't have selling_price, need to calculate from recipes
-                # For now, assume it's available
-                pass
-            elif item_type == "snack":
-                snack = Snack.objects.get(id=int(item_id), is_active=True)
-                total_amount += snack.selling_price * quantity
-            else:
-                unavailable_items.append(f"Unknown item type: {item_type}")
-                continue
-        except Exception as e:
-            unavailable_items.append(f"{item_type} {item_id}: {str(e)}")
+    for item, obj in zip(order_items, objects):
+        if obj is None:
             continue
 
+        total_amount += ITEM_HANDLERS[item["type"]].price(obj, item["quantity"])
+
         # Check addons availability
         for addon in item.get("addons", []):
             total_amount += Decimal(str(addon.get("unit_price", "0"))) * addon.get("quantity", 1)
@@ -88,101 +222,152 @@ def calculate_scheduled_time() -> timezone.datetime:
 
     Returns the next opening time of the store.
     """
-    from core.utils import next_opening_datetime
     return next_opening_datetime()
 
 
-def create_order_items_and_addons(order: Order, order_items: list):
+def create_order_items_and_addons(order: Order, order_items: list, order_addons: list = ()):
     """
     Create OrderItem, OrderCombo, OrderSnack, and OrderAddon records.
+
+    Item-level and global addons are written in ONE bulk insert.
     """
-    from menu.models import Combo, PreparedItem
-    from snacks.models import Snack
+    objects, errors = fetch_order_item_objects(order_items)
+    if errors:
+        raise ValidationError(f"Menu items unavailable: {errors}")
 
-    combos_to_create = []
-    items_to_create = []
-    snacks_to_create = []
+    rows_by_model = {}
     addons_to_create = []
 
-    for item in order_items:
+    for item, obj in zip(order_items, objects):
         item_type = item["type"]
-        item_id = item["id"]
-        quantity = item["quantity"]
+        handler = ITEM_HANDLERS[item_type]
 
-        if item_type == "combo":
-            combo = Combo.objects.get(id=item_id)
-            combos_to_create.append(OrderCombo(
-                order=order,
-                combo=combo,
-                quantity=quantity
-            ))
-            parent_type = "combo"
-            parent_id = item_id
-
-        elif item_type == "item":
-            prepared_item = PreparedItem.objects.get(id=item_id)
-            items_to_create.append(OrderItem(
-                order=order,
-                prepared_item=prepared_item,
-                quantity=quantity
-            ))
-            parent_type = "item"
-            parent_id = item_id
-
-        elif item_type == "snack":
-            snack = Snack.objects.get(id=int(item_id))
-            snacks_to_create.append(OrderSnack(
-                order=order,
-                snack_id=snack.id,
-                snack_name=snack.name,
-                quantity=quantity,
-                unit_price=snack.selling_price
-            ))
-            parent_type = "snack"
-            parent_id = item_id
+        row = handler.build_row(order, obj, item["quantity"])
+        rows_by_model.setdefault(type(row), []).append(row)
 
         # Create addons for this item
+        parent = handler.addon_parent(obj)
         for addon in item.get("addons", []):
             addons_to_create.append(OrderAddon(
                 order=order,
-                order_item_type=parent_type,
-                combo_id=parent_id if parent_type == "combo" else None,
-                prepared_item_id=parent_id if parent_type == "item" else None,
-                snack_id=int(parent_id) if parent_type == "snack" else None,
+                order_item_type=item_type,
                 addon_name=addon["name"],
                 addon_category=addon.get("category", ""),
                 quantity=addon.get("quantity", 1),
-                unit_price=Decimal(str(addon["unit_price"]))
+                unit_price=Decimal(str(addon["unit_price"])),
+                **parent
             ))
 
+    # Global addons are not tied to specific items
+    for addon in order_addons:
+        addons_to_create.append(OrderAddon(
+            order=order,
+            order_item_type="global",
+            addon_name=addon["name"],
+            addon_category=addon.get("category", ""),
+            quantity=addon.get("quantity", 1),
+            unit_price=Decimal(str(addon["unit_price"]))
+        ))
+
     # Bulk create all items
-    OrderCombo.objects.bulk_create(combos_to_create)
-    OrderItem.objects.bulk_create(items_to_create)
-    OrderSnack.objects.bulk_create(snacks_to_create)
-    OrderAddon.objects.bulk_create(addons_to_create)
+    for model, rows in rows_by_model.items():
+        model.objects.bulk_create(rows)
+    bulk_create_addons(addons_to_create)
+
+
+def bulk_create_addons(addons: list):
+    """
+    Insert OrderAddon rows in one round trip.
+
+    The same addon listed twice for one parent is merged (quantities
+    summed, so rows still add up to the billed total) to satisfy the
+    `uniq_addon_per_order_*` constraints; any conflict left over from a
+    client retry is dropped by the database instead of aborting checkout.
+    """
+    merged = {}
+    for addon in addons:
+        key = (
+            addon.order_item_type,
+            addon.combo_id,
+            addon.prepared_item_id,
+            addon.snack_id,
+            addon.addon_name,
+        )
+        if key in merged:
+            merged[key].quantity += addon.quantity
+        else:
+            merged[key] = addon
+
+    OrderAddon.objects.bulk_create(
+        merged.values(),
+        batch_size=100,
+        ignore_conflicts=True,
+    )
+
+
+def cart_cache_key(stamp: dict) -> str:
+    """Versioned by the cart's write stamp: a cart or line write changes the key."""
+    lines_at = stamp["lines_at"]
+    return "cart:{}:{}:{}:{}".format(
+        stamp["pk"],
+        stamp["updated_at"].timestamp(),
+        lines_at.timestamp() if lines_at else 0,
+        stamp["lines_n"],
+    )
 
 
-def handle_customer_creation(order: Order, order_data: dict):
+def handle_customer_creation(order_data: dict):
     """
-    Handle customer creation and linking.
+    Handle customer creation; returns the Customer to link, or None.
+
+    Resolved BEFORE the order insert so the FK goes in with the row
+    (no follow-up UPDATE) and the post_save metrics see created=True.
     """
     phone = (order_data.get("customer_phone") or "").strip()
 
-    if phone and PHONE_RE.match(phone):
-        customer, created = Customer.objects.get_or_create(
-            phone=phone,
-            defaults={
-                "name": order_data.get("customer_name", ""),
-                "email": order_data.get("customer_email", ""),
-            }
-        )
+    if not (phone and PHONE_RE.match(phone)):
+        return None
 
-        # Send welcome OTP for new customers
-        if created:
-            send_welcome_otp(customer)
+    customer, created = Customer.objects.get_or_create(
+        phone=phone,
+        defaults={
+            "name": order_data.get("customer_name", ""),
+            "email": order_data.get("customer_email", ""),
+        }
+    )
+
+    # Send welcome OTP for new customers
+    if created:
+        send_welcome_otp(customer)
 
-        order.customer = customer
-        order.save(update_fields=["customer"])
+    return customer
+
+
+def update_customer_metrics(customer_id, order_id, created: bool = False):
+    """
+    Apply one order's effect on Customer metrics.
+
+    Runs as a single atomic UPDATE (no read-modify-write), so concurrent
+    orders for the same customer never lose an increment.
+    """
+    created_at = (
+        Order.objects
+        .filter(pk=order_id)
+        .values_list("created_at", flat=True)
+        .first()
+    )
+    placed_at = Value(created_at or timezone.now(), output_field=DateTimeField())
+
+    updates = {
+        "first_order_at": Least(Coalesce("first_order_at", placed_at), placed_at),
+        "last_order_at": Greatest(Coalesce("last_order_at", placed_at), placed_at),
+    }
+
+    # Increment total_orders for newly created orders
+    if created:
+        updates["total_orders"] = F("total_orders") + 1
+
+    Customer.objects.filter(pk=customer_id).update(**updates)
 
 
 def setup_payment_and_tracking(order: Order):
@@ -232,19 +417,12 @@ def send_welcome_otp(customer: Customer):
     """
     Send welcome OTP to new customers.
     """
-    from accounts.models import OTP
-    from accounts.sms import send_sms
-    from django.utils import timezone
-    from datetime import timedelta
-    import threading
-
     def _send_otp():
         try:
             # Invalidate existing OTPs
             OTP.objects.filter(phone=customer.phone, is_used=False).update(is_used=True)
 
             # Generate new OTP
-            import random
             code = f"{random.randint(100000, 999999)}"
 
             otp = OTP.objects.create(
@@ -256,17 +434,16 @@ def send_welcome_otp(customer: Customer):
             # Send SMS
             sms_sent = send_sms(customer.phone, f"Welcome to Swad of Tamil! Your verification code is {otp.code}")
 
-            print(f"Welcome OTP sent to {customer.phone}: {code} (SMS: {sms_sent})")
+            logger.info("[OTP] Welcome OTP sent to %s (SMS: %s)", customer.phone, sms_sent)
 
-        except Exception as e:
-            print(f"Failed to send welcome OTP: {e}")
+        except Exception:
+            logger.exception("[OTP] Failed to send welcome OTP to %s", customer.phone)
 
     # Send in background thread
     thread = threading.Thread(target=_send_otp, daemon=True)
     thread.start()
 
 
-@transaction.atomic
 def create_order_from_normalized_payload(payload: dict) -> Order:
     """
     SCALABLE ORDER CREATION: Normalized payload structure.
@@ -289,11 +466,105 @@ def create_order_from_normalized_payload(payload: dict) -> Order:
                 "addons": [...]  # optional
             }
         ],
-        "order_addons": [...]  # optional global addons
+        "order_addons": [...],  # optional global addons
+        "idempotency_key": str  # optional, see below
     }
+
+    IDEMPOTENCY: a retried checkout with the same key (double-tap, client
+    retry) returns the original order instead of placing a duplicate. The
+    key is claimed with an atomic cache add (SETNX) before any DB work; the
+    orders_idem_key unique constraint backs it up when two workers race.
     """
-    from core.utils import store_runtime_status
+    idempotency_key = (
+        payload.get("idempotency_key")
+        or (payload.get("order", {}).get("metadata") or {}).get("idempotency_key")
+    )
+    if not idempotency_key:
+        return _place_order(payload)
+
+    cache_key = idempotency_cache_key(idempotency_key)
+
+    if not cache.add(cache_key, IDEMPOTENCY_PENDING, IDEMPOTENCY_CLAIM_TIMEOUT):
+        existing_id = cache.get(cache_key)
+        if existing_id == IDEMPOTENCY_PENDING:
+            raise OrderInProgress("This order is already being placed")
+
+        existing = Order.objects.filter(pk=existing_id).first() if existing_id else None
+        if existing:
+            return existing
+
+        # Stale mapping (order gone / key expired meanwhile) — claim again
+        cache.set(cache_key, IDEMPOTENCY_PENDING, IDEMPOTENCY_CLAIM_TIMEOUT)
+
+    # Mapping expired or evicted: fall back to the orders_idem_key index
+    existing = Order.find_by_idempotency_key(idempotency_key)
+    if existing:
+        cache.set(cache_key, str(existing.pk), IDEMPOTENCY_TIMEOUT)
+        return existing
+
+    try:
+        order = _place_order(payload, idempotency_key)
+    except IntegrityError:
+        # Lost the race to a worker whose claim this cache never saw:
+        # orders_idem_key kept it to one order, so answer with that one
+        existing = Order.find_by_idempotency_key(idempotency_key)
+        if existing is None:
+            cache.delete(cache_key)
+            raise
+        cache.set(cache_key, str(existing.pk), IDEMPOTENCY_TIMEOUT)
+        return existing
+    except Exception:
+        # Release the claim so the client can retry
+        cache.delete(cache_key)
+        raise
+
+    # Publish key → order only once the order is committed. Until then the
+    # claim is held: an enclosing transaction (e.g. /orders/bulk/) can still
+    # roll the order back, and must then call release_idempotency_claims()
+    _held_claims().add(cache_key)
+    transaction.on_commit(
+        partial(_publish_idempotency_key, cache_key, str(order.pk))
+    )
+    return order
+
+
+def idempotency_cache_key(idempotency_key: str) -> str:
+    return f"idem:{idempotency_key}"
+
+
+def _held_claims():
+    # Claims whose order is not committed yet. Kept on the connection
+    # object: per database alias and per thread, like the transaction itself
+    conn = transaction.get_connection()
+    if not hasattr(conn, "_idempotency_claims"):
+        conn._idempotency_claims = set()
+    return conn._idempotency_claims
+
+
+def _publish_idempotency_key(cache_key: str, order_id: str):
+    _held_claims().discard(cache_key)
+    cache.set(cache_key, order_id, IDEMPOTENCY_TIMEOUT)
+
+
+def release_idempotency_claims():
+    """
+    Drop the pending claims of orders that were rolled back.
+
+    Call from the except path of any transaction that wraps checkout, so
+    the client's retry is not rejected as "already being placed" until
+    IDEMPOTENCY_CLAIM_TIMEOUT runs out.
+    """
+    held = _held_claims()
+    if held:
+        cache.delete_many(list(held))
+        held.clear()
 
+
+@transaction.atomic
+def _place_order(payload: dict, idempotency_key: str = None) -> Order:
+    """
+    Validate, price and persist one normalized order payload.
+    """
     # Extract payload sections
     order_data = payload.get("order", {})
     order_items = payload.get("order_items", [])
@@ -317,9 +588,13 @@ def create_order_from_normalized_payload(payload: dict) -> Order:
     for addon in order_addons:
         total_amount += Decimal(str(addon.get("unit_price", "0"))) * addon.get("quantity", 1)
 
-    # 2. ORDER PLACEMENT (DECOUPLED FROM AVAILABILITY)
+    # 2. HANDLE CUSTOMER (linked on insert)
+    customer = handle_customer_creation(order_data)
+
+    # 3. ORDER PLACEMENT (DECOUPLED FROM AVAILABILITY)
     order = Order.objects.create(
         status=Order.STATUS_PLACED,
+        customer=customer,
         total_amount=total_amount,
         payment_method=order_data.get("payment_method", "cod"),
         customer_name=order_data.get("customer_name", ""),
@@ -330,27 +605,12 @@ def create_order_from_normalized_payload(payload: dict) -> Order:
             **order_data.get("metadata", {}),
             "is_scheduled": is_scheduled,
             "scheduled_for": calculate_scheduled_time().isoformat() if is_scheduled else None,
+            **({"idempotency_key": idempotency_key} if idempotency_key else {}),
         }
     )
 
-    # 3. CREATE ORDER ITEMS AND ADDONS
-    create_order_items_and_addons(order, order_items)
-
-    # Create global addons
-    global_addons = []
-    for addon in order_addons:
-        global_addons.append(OrderAddon(
-            order=order,
-            order_item_type="global",  # Global addons not tied to specific items
-            addon_name=addon["name"],
-            addon_category=addon.get("category", ""),
-            quantity=addon.get("quantity", 1),
-            unit_price=Decimal(str(addon["unit_price"]))
-        ))
-    OrderAddon.objects.bulk_create(global_addons)
-
-    # 4. HANDLE CUSTOMER
-    handle_customer_creation(order, order_data)
+    # 4. CREATE ORDER ITEMS AND ADDONS (ITEM + GLOBAL)
+    create_order_items_and_addons(order, order_items, order_addons)
 
     # 5. SETUP PAYMENT AND TRACKING
     setup_payment_and_tracking(order)
@@ -398,8 +658,6 @@ def check_scheduled_orders():
 
     Returns orders that should be prepared now.
     """
-    from django.utils import timezone
-
     now = timezone.now()
     return Order.objects.filter(
         is_scheduled=True,
@@ -408,237 +666,64 @@ def check_scheduled_orders():
     )
 
 
-def process_scheduled_orders():
+def process_scheduled_order(order_id):
     """
-    Process all scheduled orders that are ready.
+    Confirm and start preparation for ONE due scheduled order.
 
-    This should be called by a periodic task (Celery, cron, etc.)
+    The row is locked for the whole unit of work so two workers can never
+    pick up the same order; an order that is no longer due is skipped.
     """
-    scheduled_orders = check_scheduled_orders()
-
-    for order in scheduled_orders:
-        try:
-            # Auto-confirm scheduled orders
-            order.status = Order.STATUS_CONFIRMED
-            order.save(update_fields=["status"])
-
-            OrderEvent.objects.create(
-                order=order,
-                action=Order.STATUS_CONFIRMED,
-                note="Auto-confirmed scheduled order"
-            )
-
-            # Start preparation
-            prepare_order(order)
-
-        except Exception as e:
-            # Log error but don't fail other orders
-            print(f"Failed to process scheduled order {order.id}: {e}")
-            continue
-    snacks_payload = payload.get("snacks") or []
-    customer_payload = payload.get("customer") or {}
-    metadata = payload.get("metadata") or {}
-
-    if not combos_payload and not snacks_payload:
-        raise ValidationError("Order must contain at least one combo or snack")
-
-    combo_map = {}
-
-    for row in combos_payload:
-        raw_id = row.get("id") or row.get("combo_id")
-        qty = int(row.get("quantity", 1))
-
-        if not raw_id:
-            raise ValidationError("combo_id missing")
-
-        try:
-            combo_id = UUID(str(raw_id))
-        except Exception:
-            raise ValidationError("Invalid combo UUID")
-
-        if qty < 1:
-            raise ValidationError("Combo quantity must be ≥ 1")
-
-        combo_map.setdefault(combo_id, 0)
-        combo_map[combo_id] += qty
-
-    combos = {
-        c.id: c
-        for c in Combo.objects.filter(id__in=combo_map.keys(), is_active=True)
-    }
-
-    if len(combos) != len(combo_map):
-        raise ValidationError("Invalid or inactive combo detected")
-
-    total_amount = ZERO
-    prepared_item_totals = {}
-    order_combos = []
-
-    for combo_id, qty in combo_map.items():
-        combo = combos[combo_id]
-        total_amount += combo.selling_price * qty
-
-        order_combos.append(OrderCombo(combo=combo, quantity=qty))
-
-        for ci in combo.items.all():
-            prepared_item_totals[ci.prepared_item_id] = (
-                prepared_item_totals.get(ci.prepared_item_id, 0)
-                + ci.quantity * qty
+    with transaction.atomic():
+        order = (
+            Order.objects
+            .select_for_update()
+            .filter(
+                pk=order_id,
+                is_scheduled=True,
+                status=Order.STATUS_PLACED,
             )
+            .first()
+        )
+        if order is None:
+            return
 
-    valid_items = set(
-        PreparedItem.objects.filter(
-            id__in=prepared_item_totals.keys()
-        ).values_list("id", flat=True)
-    )
-
-    if set(prepared_item_totals) - valid_items:
-        raise ValidationError("Invalid prepared_item detected")
-
-    snack_totals = {}
-
-    for row in snacks_payload:
-        sid = row.get("snack_id") or row.get("id")
-        qty = int(row.get("quantity", 1))
-
-        if not sid or qty < 1:
-            raise ValidationError("Invalid snack payload")
-
-        snack_totals[int(sid)] = snack_totals.get(int(sid), 0) + qty
-
-    snacks = {
-        s.id: s
-        for s in Snack.objects.filter(id__in=snack_totals, is_active=True)
-    }
-
-    if len(snacks) != len(snack_totals):
-        raise ValidationError("Invalid or inactive snack detected")
-
-    for sid, qty in snack_totals.items():
-        total_amount += snacks[sid].selling_price * qty
-
-    payment_method = (payload.get("payment_method") or "cod").lower()
-
-    order = Order.objects.create(
-        status=Order.STATUS_PLACED,  # Start as PLACED
-        total_amount=total_amount,
-        payment_method=payment_method,
-        customer_name=customer_payload.get("name", ""),
-        customer_phone=customer_payload.get("phone", ""),
-        customer_email=customer_payload.get("email", ""),
-        customer_address=customer_payload.get("address", ""),
-        metadata=metadata,
-    )
-
-    phone = (customer_payload.get("phone") or "").strip()
-
-    if phone:
-        if not PHONE_RE.match(phone):
-            raise ValidationError("Invalid phone format")
+        # Auto-confirm scheduled orders
+        order.status = Order.STATUS_CONFIRMED
+        order.save(update_fields=["status"])
 
-        customer, created = Customer.objects.get_or_create(
-            phone=phone,
-            defaults={
-                "name": customer_payload.get("name", ""),
-                "email": customer_payload.get("email", ""),
-            }
-        )
-        
-        # Send OTP in background for new customers
-        if created:
-            from django.core.mail import send_mail
-            from django.conf import settings
-            import threading
-            
-            def send_welcome_otp():
-                try:
-                    # Generate and send OTP
-                    from accounts.models import OTP
-                    from accounts.sms import send_sms
-                    from django.utils import timezone
-                    from datetime import timedelta
-                    
-                    # Invalidate any existing unused OTPs
-                    OTP.objects.filter(phone=phone, is_used=False).update(is_used=True)
-                    
-                    # Generate new OTP
-                    import random
-                    code = f"{random.randint(100000, 999999)}"
-                    
-                    otp = OTP.objects.create(
-                        phone=phone,
-                        code=code,
-                        expires_at=timezone.now() + timedelta(minutes=10),
-                    )
-                    
-                    # Send SMS (non-blocking)
-                    sms_sent = send_sms(phone, f"Welcome to Swad of Tamil! Your verification code is {otp.code}")
-                    
-                    # Log for debugging
-                    print(f"Welcome OTP sent to {phone}: {code} (SMS: {sms_sent})")
-                    
-                except Exception as e:
-                    print(f"Failed to send welcome OTP: {e}")
-            
-            # Send OTP in background thread
-            thread = threading.Thread(target=send_welcome_otp, daemon=True)
-            thread.start()
-        
-        order.customer = customer
-        order.save(update_fields=["customer"])
-
-    for oc in order_combos:
-        oc.order = order
-    OrderCombo.objects.bulk_create(order_combos)
-
-    OrderItem.objects.bulk_create([
-        OrderItem(order=order, prepared_item_id=pid, quantity=qty)
-        for pid, qty in prepared_item_totals.items()
-    ])
-
-    OrderSnack.objects.bulk_create([
-        OrderSnack(
+        OrderEvent.objects.create(
             order=order,
-            snack_id=s.id,
-            snack_name=s.name,
-            quantity=snack_totals[s.id],
-            unit_price=s.selling_price,
+            action=Order.STATUS_CONFIRMED,
+            note="Auto-confirmed scheduled order"
         )
-        for s in snacks.values()
-    ])
 
-    if payment_method == Order.PAYMENT_METHOD_COD:
-        short = str(order.id)[:8]
-        order.tracking_code = f"COD-{timezone.now().year}-{short}"
-        order.save(update_fields=["tracking_code"])
+        # Start preparation
+        prepare_order(order)
 
-        if phone:
-            try:
-                send_sms(
-                    phone,
-                    f"Order {order.order_number} placed. "
-                    f"Tracking {order.tracking_code} – Swad of Tamil"
-                )
-            except Exception:
-                pass
 
-    OrderEvent.objects.create(
-        order=order,
-        action=Order.STATUS_PLACED,
-        note="Order placed"
-    )
+def process_scheduled_orders():
+    """
+    Fan out all scheduled orders that are ready, one task per order.
 
-    # Auto-confirm order immediately (simulate instant confirmation)
-    order.status = Order.STATUS_CONFIRMED
-    order.save(update_fields=["status"])
-    
-    OrderEvent.objects.create(
-        order=order,
-        action=Order.STATUS_CONFIRMED,
-        note="Order auto-confirmed"
+    This should be called by a periodic task (Celery beat, cron, etc.)
+    Each order runs in its own transaction, so one failure never blocks
+    the rest of the batch.
+    """
+    # Stream ids only — a backlog burst never materializes full rows
+    order_ids = (
+        check_scheduled_orders()
+        .values_list("id", flat=True)
+        .iterator(chunk_size=500)
     )
 
-    return order
+    for order_id in order_ids:
+        try:
+            process_one_scheduled_order.delay(str(order_id))
+        except Exception:
+            # Log error but don't fail other orders
+            logger.exception("Failed to process scheduled order %s", order_id)
+            continue
+
 
 @transaction.atomic
 def confirm_order(order: Order):
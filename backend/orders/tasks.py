@@ -0,0 +1,51 @@
+try:
+    from celery import shared_task
+except Exception:
+    shared_task = None
+
+
+# ======================================================
+# TASK REGISTRATION (CELERY OPTIONAL)
+# ======================================================
+def task(func):
+    """
+    Register `func` as a Celery task when Celery is installed.
+
+    Without Celery, `.delay()` simply runs the function inline so callers
+    never need to know which mode is active.
+    """
+    if shared_task:
+        return shared_task(func)
+
+    func.delay = func
+    return func
+
+
+# ======================================================
+# SCHEDULED ORDERS
+# ======================================================
+@task
+def process_one_scheduled_order(order_id):
+    """Confirm + prepare a single due scheduled order (one task per order)."""
+    from orders.services import process_scheduled_order
+
+    process_scheduled_order(order_id)
+
+
+@task
+def process_scheduled_orders_task():
+    """Periodic (beat) entry point — fans out one task per due order."""
+    from orders.services import process_scheduled_orders
+
+    process_scheduled_orders()
+
+
+# ======================================================
+# CUSTOMER METRICS
+# ======================================================
+@task
+def update_customer_metrics_task(customer_id, order_id, created=False):
+    """Update Customer order metrics outside the checkout transaction."""
+    from orders.services import update_customer_metrics
+
+    update_customer_metrics(customer_id, order_id, created)
@@ -1,3 +1,584 @@
-from django.test import TestCase
+import uuid
+from datetime import timedelta
+from decimal import Decimal
+from unittest import mock
 
-# Create your tests here.
+from django.contrib.auth import get_user_model
+from django.core.cache import cache
+from django.db import DatabaseError, connection
+from django.test import TestCase, skipUnlessDBFeature
+from django.test.utils import CaptureQueriesContext
+from django.utils import timezone
+from rest_framework.test import APIClient
+
+from accounts.models import Customer
+from core.tests.utils import MigrationTestCase
+from menu.models import PreparedItem
+from orders.models import Address, Cart, CartLine, Order, OrderItem
+from orders.services import (
+    IDEMPOTENCY_PENDING,
+    ITEM_HANDLERS,
+    ItemHandler,
+    fetch_order_item_objects,
+    idempotency_cache_key,
+)
+from snacks.models import Snack
+
+
+class CheckoutTestCase(TestCase):
+    """Places real orders through /api/orders/ with the store open."""
+
+    def setUp(self):
+        cache.clear()
+        self.client = APIClient()
+        self.snack = Snack.objects.create(
+            name="Murukku",
+            selling_price=Decimal("50"),
+            buying_price=Decimal("30"),
+            mrp=Decimal("60"),
+        )
+
+        patches = (
+            mock.patch(
+                "orders.services.store_runtime_status",
+                return_value={"accept_orders": True},
+            ),
+            # Welcome OTP runs in a background thread
+            mock.patch("orders.services.send_welcome_otp"),
+        )
+        for patcher in patches:
+            patcher.start()
+            self.addCleanup(patcher.stop)
+
+    def payload(self, phone="9876543210", idempotency_key=None):
+        order = {"customer_phone": phone, "customer_address": "12 Temple St"}
+        if idempotency_key:
+            order["metadata"] = {"idempotency_key": idempotency_key}
+        return {
+            "order": order,
+            "order_items": [{"type": "snack", "id": self.snack.id, "quantity": 1}],
+        }
+
+    def checkout(self, payload, url="/api/orders/", **extra):
+        # Run on_commit hooks (cache publishes) as a real commit would
+        with self.captureOnCommitCallbacks(execute=True):
+            return self.client.post(url, payload, format="json", **extra)
+
+
+# ======================================================
+# CUSTOMER RESOLUTION
+# ======================================================
+
+class CustomerResolutionTests(CheckoutTestCase):
+    def test_repeat_verified_customer_stays_verified(self):
+        user = get_user_model().objects.create_user(username="meena", password=None)
+        customer = Customer.objects.create(phone="9876543210", user=user)
+
+        for _ in range(2):
+            response = self.checkout(self.payload())
+            self.assertEqual(response.status_code, 201)
+            self.assertIs(response.json()["customer_verified"], True)
+
+        self.assertEqual(Order.objects.filter(customer=customer).count(), 2)
+
+    def test_metrics_count_created_orders_only(self):
+        response = self.checkout(self.payload())
+        order = Order.objects.get(pk=response.json()["id"])
+
+        with self.captureOnCommitCallbacks() as callbacks:
+            order.status = Order.STATUS_CONFIRMED
+            order.save(update_fields=["status"])
+
+        self.assertEqual(callbacks, [])
+        self.assertEqual(order.customer.total_orders, 1)
+
+    def test_phone_change_resolves_a_new_customer(self):
+        self.checkout(self.payload(phone="9876543210"))
+        customer = Customer.objects.get(phone="9876543210")
+
+        customer.phone = "9123456780"
+        customer.save()
+
+        response = self.checkout(self.payload(phone="9876543210"))
+        self.assertEqual(response.status_code, 201)
+
+        order = Order.objects.get(pk=response.json()["id"])
+        self.assertNotEqual(order.customer_id, customer.pk)
+        self.assertEqual(order.customer.phone, "9876543210")
+
+
+# ======================================================
+# ORDER LINE RESOLUTION
+# ======================================================
+
+class FetchOrderItemObjectsTests(CheckoutTestCase):
+    def test_reports_offending_ids(self):
+        objects, errors = fetch_order_item_objects([
+            {"type": "snack", "id": self.snack.id, "quantity": 1},
+            {"type": "combo", "id": "not-a-uuid", "quantity": 1},
+            {"type": "snack", "id": 999999, "quantity": 1},
+            {"type": "beverage", "id": 1, "quantity": 1},
+        ])
+
+        self.assertEqual(objects, [self.snack, None, None, None])
+        self.assertEqual(errors, [
+            "combo 'not-a-uuid': invalid id",
+            "snack 999999: not found or inactive",
+            "Unknown item type: beverage",
+        ])
+
+    def test_database_errors_are_not_swallowed(self):
+        with mock.patch.object(
+            ITEM_HANDLERS["snack"], "bulk_fetch", side_effect=DatabaseError("down")
+        ):
+            with self.assertRaises(DatabaseError):
+                fetch_order_item_objects(
+                    [{"type": "snack", "id": self.snack.id, "quantity": 1}]
+                )
+
+    def test_handler_base_is_abstract(self):
+        with self.assertRaises(TypeError):
+            ItemHandler()
+
+
+# ======================================================
+# IDEMPOTENT CHECKOUT
+# ======================================================
+
+class IdempotencyTests(CheckoutTestCase):
+    def test_retry_returns_original_order(self):
+        first = self.checkout(self.payload(idempotency_key="k-1"))
+        second = self.checkout(self.payload(idempotency_key="k-1"))
+
+        self.assertEqual(first.status_code, 201)
+        self.assertEqual(second.status_code, 201)
+        self.assertEqual(first.json()["id"], second.json()["id"])
+        self.assertEqual(Order.objects.count(), 1)
+        self.assertEqual(
+            cache.get(idempotency_cache_key("k-1")), first.json()["id"]
+        )
+
+    def test_header_key(self):
+        first = self.checkout(self.payload(), HTTP_X_IDEMPOTENCY_KEY="k-2")
+        second = self.checkout(self.payload(), HTTP_X_IDEMPOTENCY_KEY="k-2")
+
+        self.assertEqual(first.json()["id"], second.json()["id"])
+        self.assertEqual(Order.objects.count(), 1)
+
+    def test_in_flight_duplicate_gets_409(self):
+        cache.set(idempotency_cache_key("k-3"), IDEMPOTENCY_PENDING)
+
+        response = self.checkout(self.payload(idempotency_key="k-3"))
+
+        self.assertEqual(response.status_code, 409)
+        self.assertFalse(Order.objects.exists())
+
+    def test_expired_mapping_falls_back_to_database(self):
+        first = self.checkout(self.payload(idempotency_key="k-4"))
+        cache.clear()
+
+        second = self.checkout(self.payload(idempotency_key="k-4"))
+
+        self.assertEqual(first.json()["id"], second.json()["id"])
+        self.assertEqual(Order.objects.count(), 1)
+        self.assertEqual(
+            Order.find_by_idempotency_key("k-4").pk, Order.objects.get().pk
+        )
+
+    def test_race_lost_across_workers_returns_winner(self):
+        # Another worker placed the order; its claim lived in its own cache
+        winner = Order.objects.create(
+            customer_phone="9876543210", metadata={"idempotency_key": "k-6"}
+        )
+        lookup = Order.find_by_idempotency_key
+        # Not committed yet when this worker probed; visible after the insert
+        probes = [lambda key: None, lookup]
+
+        with mock.patch.object(
+            Order,
+            "find_by_idempotency_key",
+            side_effect=lambda key: probes.pop(0)(key),
+        ):
+            response = self.checkout(self.payload(idempotency_key="k-6"))
+
+        self.assertEqual(response.status_code, 201)
+        self.assertEqual(response.json()["id"], str(winner.pk))
+        self.assertEqual(Order.objects.count(), 1)
+        self.assertEqual(cache.get(idempotency_cache_key("k-6")), str(winner.pk))
+
+    def test_failed_checkout_releases_claim(self):
+        payload = self.payload(idempotency_key="k-5")
+        payload["order_items"][0]["id"] = 999999
+
+        response = self.checkout(payload)
+
+        self.assertNotEqual(response.status_code, 201)
+        self.assertIsNone(cache.get(idempotency_cache_key("k-5")))
+        self.assertEqual(
+            self.checkout(self.payload(idempotency_key="k-5")).status_code, 201
+        )
+
+
+# ======================================================
+# BULK CHECKOUT
+# ======================================================
+
+class BulkCheckoutTests(CheckoutTestCase):
+    url = "/api/orders/bulk/"
+
+    def test_places_every_order(self):
+        response = self.checkout(
+            [self.payload(), self.payload(phone="9123456780")], url=self.url
+        )
+
+        self.assertEqual(response.status_code, 201)
+        self.assertEqual(len(response.json()), 2)
+        self.assertEqual(Order.objects.count(), 2)
+
+    def test_rejects_empty_body(self):
+        self.assertEqual(self.checkout([], url=self.url).status_code, 400)
+        self.assertEqual(self.checkout({}, url=self.url).status_code, 400)
+
+    def test_failure_rolls_back_batch_and_releases_claims(self):
+        bad = self.payload(phone="9123456780")
+        bad["order_items"][0]["id"] = 999999
+
+        response = self.checkout(
+            [self.payload(idempotency_key="b-1"), bad], url=self.url
+        )
+
+        self.assertEqual(response.status_code, 500)
+        self.assertFalse(Order.objects.exists())
+        # The first order's claim must not block its retry
+        self.assertIsNone(cache.get(idempotency_cache_key("b-1")))
+        retry = self.checkout(self.payload(idempotency_key="b-1"))
+        self.assertEqual(retry.status_code, 201)
+        self.assertEqual(Order.objects.count(), 1)
+
+
+# ======================================================
+# CART CACHE
+# ======================================================
+
+class CartCacheTests(TestCase):
+    url = "/api/orders/cart/"
+
+    def setUp(self):
+        cache.clear()
+        self.client = APIClient()
+        self.cart = Cart.objects.create(session_key="sess-1")
+
+    def get_cart(self):
+        return self.client.get(self.url, {"session": "sess-1"}).json()
+
+    def add_line(self, name):
+        return CartLine.objects.create(
+            cart=self.cart,
+            type=CartLine.TYPE_SNACK,
+            snack_id=1,
+            snack_name=name,
+            unit_price=Decimal("50"),
+        )
+
+    def test_hit_runs_only_the_stamp_query(self):
+        self.add_line("Murukku")
+        self.get_cart()
+
+        with self.assertNumQueries(1):
+            self.get_cart()
+
+    def test_line_writes_change_the_key(self):
+        self.assertEqual(self.get_cart()["lines"], [])
+
+        line = self.add_line("Murukku")
+        self.assertEqual(
+            [l["snack_name"] for l in self.get_cart()["lines"]], ["Murukku"]
+        )
+
+        line.delete()
+        self.assertEqual(self.get_cart()["lines"], [])
+
+    def test_line_write_runs_no_extra_queries(self):
+        with self.assertNumQueries(1):
+            self.add_line("Murukku")
+
+    def test_deleted_cart_is_empty(self):
+        self.get_cart()
+
+        response = self.client.delete(f"{self.url}?id={self.cart.pk}")
+
+        self.assertEqual(response.status_code, 200)
+        self.assertEqual(self.get_cart(), {})
+
+
+# ======================================================
+# STAFF ACTIONS
+# ======================================================
+
+class StaffTestCase(TestCase):
+    def setUp(self):
+        self.client = APIClient()
+        self.order = Order.objects.create(customer_phone="9876543210")
+        self.staff = get_user_model().objects.create_user(
+            username="kitchen", password=None, is_staff=True
+        )
+
+
+class StaffActionTests(StaffTestCase):
+    def test_role_header_is_not_enough(self):
+        for method, url in (
+            ("post", f"/api/orders/{self.order.pk}/prepare/"),
+            ("post", "/api/orders/process_scheduled/"),
+            ("get", "/api/orders/scheduled_status/"),
+            ("get", f"/api/orders/{self.order.pk}/summary/"),
+        ):
+            with self.subTest(url=url):
+                response = getattr(self.client, method)(url, HTTP_X_ROLE="admin")
+                self.assertEqual(response.status_code, 403)
+
+    def test_staff_can_read_summary(self):
+        self.client.force_authenticate(self.staff)
+
+        response = self.client.get(f"/api/orders/{self.order.pk}/summary/")
+
+        self.assertEqual(response.status_code, 200)
+        self.assertEqual(response.json()["total_items"], 0)
+
+
+class ScheduledStatusTests(StaffTestCase):
+    url = "/api/orders/scheduled_status/"
+
+    def test_lists_due_orders_in_one_query(self):
+        due = Order.objects.create(
+            customer_phone="9876543210",
+            customer_name="Meena",
+            total_amount=Decimal("120.50"),
+            is_scheduled=True,
+            scheduled_for=timezone.now() - timedelta(minutes=5),
+        )
+        Order.objects.create(
+            customer_phone="9876543210",
+            is_scheduled=True,
+            scheduled_for=timezone.now() + timedelta(hours=1),
+        )
+        self.client.force_authenticate(self.staff)
+
+        with self.assertNumQueries(1):
+            response = self.client.get(self.url)
+
+        body = response.json()
+        self.assertEqual(body["ready_count"], 1)
+        self.assertEqual(body["orders"][0]["id"], str(due.pk))
+        self.assertEqual(body["orders"][0]["customer_name"], "Meena")
+        self.assertEqual(body["orders"][0]["total_amount"], "120.50")
+        self.assertEqual(
+            set(body["orders"][0]),
+            {"id", "order_number", "scheduled_for", "customer_name", "total_amount"},
+        )
+
+
+# ======================================================
+# KITCHEN SCREEN
+# ======================================================
+
+class KitchenScreenTests(TestCase):
+    url = "/api/orders/kitchen/"
+
+    def setUp(self):
+        self.idli = PreparedItem.objects.create(
+            name="Idli", unit="pcs", serving_size=Decimal("1"), selling_price=Decimal("40")
+        )
+
+    def order(self, status, items=1):
+        order = Order.objects.create(customer_phone="9876543210", status=status)
+        for _ in range(items):
+            OrderItem.objects.create(order=order, prepared_item=self.idli, quantity=2)
+        return order
+
+    def test_shows_confirmed_orders_only(self):
+        confirmed = self.order(Order.STATUS_CONFIRMED)
+        placed = self.order(Order.STATUS_PLACED)
+
+        response = self.client.get(self.url)
+
+        self.assertEqual(response.status_code, 200)
+        self.assertEqual(list(response.context["orders"]), [confirmed])
+        self.assertNotContains(response, f"Order {placed.id}")
+        self.assertContains(response, "x2")
+
+    def test_query_count_is_flat(self):
+        for _ in range(3):
+            self.order(Order.STATUS_CONFIRMED, items=2)
+
+        # Orders + one prefetch for all their items
+        with self.assertNumQueries(2):
+            self.client.get(self.url)
+
+
+class RowLockTests(StaffTestCase):
+    def prepare(self, pk):
+        self.client.force_authenticate(self.staff)
+        return self.client.post(f"/api/orders/{pk}/prepare/")
+
+    def update_status(self, pk):
+        return self.client.post(
+            f"/api/orders/{pk}/update_status/",
+            {"status": Order.STATUS_CONFIRMED},
+            HTTP_X_ROLE="admin",
+        )
+
+    def test_missing_order_is_404(self):
+        missing = uuid.uuid4()
+
+        self.assertEqual(self.prepare(missing).status_code, 404)
+        self.assertEqual(self.update_status(missing).status_code, 404)
+
+    def test_prepare_rejects_unconfirmed_order(self):
+        response = self.prepare(self.order.pk)
+
+        self.assertEqual(response.status_code, 400)
+        self.order.refresh_from_db()
+        self.assertEqual(self.order.status, Order.STATUS_PLACED)
+
+    @skipUnlessDBFeature("has_select_for_update")
+    def test_reads_the_order_under_a_row_lock(self):
+        for call in (self.prepare, self.update_status):
+            with self.subTest(action=call.__name__):
+                with CaptureQueriesContext(connection) as queries:
+                    call(self.order.pk)
+
+                self.assertTrue(
+                    any("FOR UPDATE" in q["sql"] for q in queries.captured_queries)
+                )
+
+
+# ======================================================
+# STATUS UPDATES
+# ======================================================
+
+class UpdateStatusTests(TestCase):
+    def setUp(self):
+        self.client = APIClient()
+        self.order = Order.objects.create(customer_phone="9876543210")
+
+    def update_status(self, new_status):
+        return self.client.post(
+            f"/api/orders/{self.order.pk}/update_status/",
+            {"status": new_status},
+            HTTP_X_ROLE="admin",
+        )
+
+    def test_follows_transition_table(self):
+        self.assertEqual(self.update_status(Order.STATUS_CONFIRMED).status_code, 200)
+
+        self.order.refresh_from_db()
+        self.assertEqual(self.order.status, Order.STATUS_CONFIRMED)
+        self.assertEqual(self.order.events.get().action, Order.STATUS_CONFIRMED)
+
+    def test_rejects_moving_out_of_a_final_state(self):
+        Order.objects.filter(pk=self.order.pk).update(status=Order.STATUS_DELIVERED)
+
+        response = self.update_status(Order.STATUS_PLACED)
+
+        self.assertEqual(response.status_code, 400)
+        self.order.refresh_from_db()
+        self.assertEqual(self.order.status, Order.STATUS_DELIVERED)
+        self.assertFalse(self.order.events.exists())
+
+
+# ======================================================
+# ADDRESSES
+# ======================================================
+
+class AddAddressTests(TestCase):
+    url = "/api/orders/address/add/"
+
+    def setUp(self):
+        self.client = APIClient()
+        self.customer = Customer.objects.create(phone="9876543210")
+        self.home = Address.objects.create(
+            customer=self.customer, line1="Home St", city="Chennai",
+            pincode="600001", is_default=True,
+        )
+
+    def add(self, is_default, **kwargs):
+        return self.client.post(self.url, {
+            "customer_id": self.customer.pk,
+            "line1": "Office St",
+            "city": "Chennai",
+            "pincode": "600002",
+            "is_default": is_default,
+        }, **kwargs)
+
+    def test_form_false_keeps_current_default(self):
+        for value in ("false", "0"):
+            with self.subTest(value=value):
+                self.assertEqual(self.add(value).status_code, 201)
+
+        self.home.refresh_from_db()
+        self.assertTrue(self.home.is_default)
+        self.assertEqual(self.customer.addresses.filter(is_default=True).count(), 1)
+
+    def test_new_default_demotes_the_old_one(self):
+        response = self.add(True, format="json")
+
+        self.home.refresh_from_db()
+        self.assertFalse(self.home.is_default)
+        self.assertTrue(Address.objects.get(pk=response.json()["id"]).is_default)
+
+    def test_rejects_unparseable_flag(self):
+        self.assertEqual(self.add("maybe").status_code, 400)
+
+
+# ======================================================
+# DATA MIGRATIONS
+# ======================================================
+
+class DedupeIdempotencyKeysMigrationTests(MigrationTestCase):
+    app = "orders"
+    migrate_from = "0018_order_phone_created_index"
+    migrate_to = "0019_order_idempotency_key_unique"
+
+    def seed(self, apps):
+        Order = apps.get_model("orders", "Order")
+        self.first = Order.objects.create(metadata={"idempotency_key": "dup"})
+        self.second = Order.objects.create(metadata={"idempotency_key": "dup", "source": "web"})
+        self.solo = Order.objects.create(metadata={"idempotency_key": "solo"})
+
+    def test_keeps_earliest_order_per_key(self):
+        Order = self.apps.get_model("orders", "Order")
+        metadata = dict(Order.objects.values_list("pk", "metadata"))
+
+        self.assertEqual(metadata[self.first.pk], {"idempotency_key": "dup"})
+        self.assertEqual(metadata[self.second.pk], {"source": "web"})
+        self.assertEqual(metadata[self.solo.pk], {"idempotency_key": "solo"})
+
+
+class DedupeDefaultAddressesMigrationTests(MigrationTestCase):
+    app = "orders"
+    migrate_from = "0019_order_idempotency_key_unique"
+    migrate_to = "0020_address_one_default"
+
+    def seed(self, apps):
+        Customer = apps.get_model("accounts", "Customer")
+        Address = apps.get_model("orders", "Address")
+        customer = Customer.objects.create(phone="9876543210")
+        other = Customer.objects.create(phone="9123456780")
+
+        def address(owner, line1):
+            return Address.objects.create(
+                customer=owner, line1=line1, city="Chennai",
+                pincode="600001", is_default=True,
+            )
+
+        self.old = address(customer, "Old St")
+        self.new = address(customer, "New St")
+        self.other = address(other, "Other St")
+
+    def test_keeps_newest_default_per_customer(self):
+        Address = self.apps.get_model("orders", "Address")
+        defaults = set(
+            Address.objects.filter(is_default=True).values_list("pk", flat=True)
+        )
+
+        self.assertEqual(defaults, {self.new.pk, self.other.pk})
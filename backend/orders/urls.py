@@ -11,13 +11,10 @@ router = DefaultRouter()
 router.register(r"", OrderViewSet, basename="order")
 
 urlpatterns = [
-    # API routes (REST framework) - no extra api/ prefix needed
-    path("", include(router.urls)),
-
     # --------------------------------------------------
     # ORDER ROUTES (Legacy / Direct)
     # --------------------------------------------------
-    path("", views.create_order, name="order-create"),
+    # POST /orders/ is handled by OrderViewSet.create (router below)
     path("search/", views.search_orders, name="order-search"),
     path("latest/", views.latest_order, name="order-latest"),
     path("kitchen/", views.kitchen_screen, name="order-kitchen"),
@@ -34,4 +31,9 @@ urlpatterns = [
     # ADDRESS ROUTES
     # --------------------------------------------------
     path("address/add/", views.add_address, name="address-add"),
+
+    # API routes (REST framework) - no extra api/ prefix needed.
+    # Mounted LAST so its catch-all detail route (/<pk>/) cannot
+    # shadow the explicit paths above.
+    path("", include(router.urls)),
 ]
@@ -1,10 +1,12 @@
-from rest_framework import status
-from rest_framework.decorators import action, api_view, permission_classes
+import logging
+
+from rest_framework import serializers, status
+from rest_framework.decorators import api_view, permission_classes
 from rest_framework.permissions import AllowAny
 from rest_framework.response import Response
-from rest_framework.viewsets import ModelViewSet
 
-from django.db.models import Prefetch
+from django.db.models import Count, Max, Prefetch
+from django.core.cache import cache
 from django.db import transaction
 from django.shortcuts import render, get_object_or_404
 from django.http import JsonResponse
@@ -12,233 +14,29 @@ from django.http import JsonResponse
 from .models import (
     Order,
     OrderItem,
-    OrderCombo,
-    OrderSnack,
-    OrderAddon,
     Cart,
     Address,
 )
 from .serializers import (
     OrderReadSerializer,
+    OrderConfirmationSerializer,
     OrderCreateSerializer,
     CartSerializer,
 )
-from orders.services import process_scheduled_orders, check_scheduled_orders
+from orders.services import CART_CACHE_TIMEOUT, cart_cache_key
 from accounts.models import Customer
 
+__all__ = [
+    "search_orders",
+    "cart_view",
+    "latest_order",
+    "kitchen_screen",
+    "print_slip",
+    "add_address",
+    "order_detail",
+]
 
-# ==========================================================
-# ORDER VIEWSET (RESTful)
-# ==========================================================
-class OrderViewSet(ModelViewSet):
-    """
-    ORDER API (ERP-SAFE)
-    ✔ Create pending orders
-    ✔ Read orders
-    ✔ Confirm (deduct stock)
-    ✔ Cancel (no restore)
-    """
-
-    permission_classes = [AllowAny]
-
-    queryset = (
-        Order.objects
-        .all()
-        .order_by("-created_at")
-        .prefetch_related(
-            Prefetch(
-                "order_items",
-                queryset=OrderItem.objects.select_related("prepared_item")
-            ),
-            "order_combos__combo",
-            "order_snacks",
-        )
-    )
-
-    def get_serializer_class(self):
-        if self.action == "create":
-            return OrderCreateSerializer
-        return OrderReadSerializer
-
-    # --------------------------------------------------
-    # UPDATE ORDER STATUS
-    # --------------------------------------------------
-    @action(detail=True, methods=["post"])
-    def update_status(self, request, pk=None):
-        order = self.get_object()
-        new_status = request.data.get("status")
-        
-        if not new_status:
-            return Response(
-                {"error": "Status is required"},
-                status=status.HTTP_400_BAD_REQUEST
-            )
-        
-        if new_status not in dict(Order.STATUS_CHOICES):
-            return Response(
-                {"error": "Invalid status"},
-                status=status.HTTP_400_BAD_REQUEST
-            )
-        
-        # Validate status transitions
-        valid_transitions = {
-            Order.STATUS_PLACED: [Order.STATUS_CONFIRMED, Order.STATUS_CANCELLED],
-            Order.STATUS_CONFIRMED: [Order.STATUS_PREPARING, Order.STATUS_CANCELLED],
-            Order.STATUS_PREPARING: [Order.STATUS_OUT_FOR_DELIVERY, Order.STATUS_CANCELLED],
-            Order.STATUS_OUT_FOR_DELIVERY: [Order.STATUS_DELIVERED],
-            Order.STATUS_DELIVERED: [],  # Final state
-            Order.STATUS_CANCELLED: [],  # Final state
-        }
-        
-        if new_status not in valid_transitions.get(order.status, []):
-            return Response(
-                {"error": f"Cannot change status from {order.status} to {new_status}"},
-                status=status.HTTP_400_BAD_REQUEST
-            )
-        
-        order.status = new_status
-        order.save(update_fields=["status"])
-        
-        # Create event
-        from orders.models import OrderEvent
-        OrderEvent.objects.create(
-            order=order,
-            action="status_changed",
-            note=f"Status changed to {new_status}"
-        )
-        
-        return Response(OrderReadSerializer(order).data)
-
-    # --------------------------------------------------
-    # CONFIRM ORDER (LEGACY)
-    # --------------------------------------------------
-    @action(detail=True, methods=["post"])
-    def confirm(self, request, pk=None):
-        # Clone request with status
-        request._data = request.data.copy()
-        request._data["status"] = Order.STATUS_CONFIRMED
-        return self.update_status(request)
-
-    # --------------------------------------------------
-    # CANCEL ORDER
-    # --------------------------------------------------
-    @action(detail=True, methods=["post"])
-    def cancel(self, request, pk=None):
-        order = self.get_object()
-
-        if order.status == Order.STATUS_CANCELLED:
-            return Response(
-                {"error": "Order already cancelled"},
-                status=status.HTTP_400_BAD_REQUEST
-            )
-
-        cancel_order(order)
-        return Response(OrderReadSerializer(order).data)
-
-    # --------------------------------------------------
-    # PROCESS SCHEDULED ORDERS (ADMIN/KITCHEN)
-    # --------------------------------------------------
-    @action(detail=False, methods=["post"])
-    def process_scheduled(self, request):
-        """Process all scheduled orders that are ready for preparation"""
-        try:
-            process_scheduled_orders()
-            return Response({"message": "Scheduled orders processed successfully"})
-        except Exception as e:
-            return Response(
-                {"error": f"Failed to process scheduled orders: {str(e)}"},
-                status=status.HTTP_500_INTERNAL_SERVER_ERROR
-            )
-
-    # --------------------------------------------------
-    # CHECK SCHEDULED ORDERS (ADMIN/KITCHEN)
-    # --------------------------------------------------
-    @action(detail=False, methods=["get"])
-    def scheduled_status(self, request):
-        """Get status of scheduled orders"""
-        scheduled_orders = check_scheduled_orders()
-        return Response({
-            "ready_count": scheduled_orders.count(),
-            "orders": [
-                {
-                    "id": str(order.id),
-                    "order_number": order.order_number,
-                    "scheduled_for": order.scheduled_for,
-                    "customer_name": order.customer_name,
-                    "total_amount": str(order.total_amount)
-                }
-                for order in scheduled_orders
-            ]
-        })
-
-    # --------------------------------------------------
-    # PREPARE ORDER (KITCHEN)
-    # --------------------------------------------------
-    @action(detail=True, methods=["post"])
-    def prepare(self, request, pk=None):
-        """Manually start preparation for a confirmed order"""
-        from orders.services import prepare_order
-        
-        order = self.get_object()
-        
-        try:
-            prepare_order(order)
-            return Response(OrderReadSerializer(order).data)
-        except ValidationError as e:
-            return Response(
-                {"error": str(e)},
-                status=status.HTTP_400_BAD_REQUEST
-            )
-
-    # --------------------------------------------------
-    # GET ORDER STATUS
-    # --------------------------------------------------
-    @action(detail=True, methods=["get"])
-    def status(self, request, pk=None):
-        order = self.get_object()
-        return Response({
-            "order_id": str(order.id),
-            "order_number": order.order_number,
-            "status": order.status,
-            "eta_minutes": order.eta_minutes,
-            "created_at": order.created_at,
-            "tracking_code": order.tracking_code,
-        })
-
-    # --------------------------------------------------
-    # FILTER BY STATUS
-    # --------------------------------------------------
-    @action(detail=False, methods=["get"])
-    def by_status(self, request):
-        status_param = request.query_params.get("status")
-        qs = self.get_queryset()
-
-        if status_param:
-            qs = qs.filter(status=status_param)
-
-        return Response(OrderReadSerializer(qs, many=True).data)
-
-    # --------------------------------------------------
-    # ORDER SUMMARY (LIGHTWEIGHT)
-    # --------------------------------------------------
-    @action(detail=True, methods=["get"])
-    def summary(self, request, pk=None):
-        order = self.get_object()
-
-        total_items = (
-            sum(i.quantity for i in order.order_items.all()) +
-            sum(c.quantity for c in order.order_combos.all())
-        )
-
-        return Response({
-            "order_id": order.id,
-            "order_number": order.order_number,
-            "status": order.status,
-            "status_display": order.get_status_display(),
-            "created_at": order.created_at,
-            "total_amount": order.total_amount,
-            "total_items": total_items,
-        })
+logger = logging.getLogger(__name__)
 
 
 # ==========================================================
@@ -273,20 +71,16 @@ def create_order(request):
     Function-based checkout endpoint for legacy frontend routes.
     Supports idempotency via X-Idempotency-Key header.
     """
-    try:
-        print("[DEBUG] Incoming order payload:", request.data)
-    except Exception:
-        pass
+    if logger.isEnabledFor(logging.DEBUG):
+        logger.debug("Incoming order payload: %r", request.data)
 
     # Idempotency check
     idempotency_key = request.headers.get("X-Idempotency-Key")
     if idempotency_key:
-        existing = Order.objects.filter(
-            metadata__idempotency_key=idempotency_key
-        ).first()
+        existing = Order.find_by_idempotency_key(idempotency_key)
         if existing:
             return Response(
-                OrderReadSerializer(existing).data,
+                OrderConfirmationSerializer(existing).data,
                 status=status.HTTP_200_OK
             )
 
@@ -297,12 +91,9 @@ def create_order(request):
 
     serializer = OrderCreateSerializer(data=request_data)
     serializer.is_valid(raise_exception=True)
-    order = serializer.save()
+    serializer.save()
 
-    return Response(
-        OrderReadSerializer(order).data,
-        status=status.HTTP_201_CREATED
-    )
+    return Response(serializer.data, status=status.HTTP_201_CREATED)
 
 
 # ==========================================================
@@ -318,18 +109,35 @@ def cart_view(request):
         session = request.query_params.get("session")
         phone = request.query_params.get("customer")
 
+        if not (session or phone):
+            return Response({}, status=status.HTTP_200_OK)
+
         qs = Cart.objects.all()
-        cart = None
 
         if session:
-            cart = qs.filter(session_key=session).first()
-        elif phone:
-            cart = qs.filter(customer__phone=phone).first()
-
-        return Response(
-            CartSerializer(cart).data if cart else {},
-            status=status.HTTP_200_OK
+            qs = qs.filter(session_key=session)
+        else:
+            qs = qs.filter(customer__phone=phone)
+
+        # Storefront polls this: one stamp query picks the cart and its
+        # version, and the serialized payload is cached under that version,
+        # so every worker sees a write on its next poll
+        stamp = (
+            qs.annotate(lines_at=Max("lines__updated_at"), lines_n=Count("lines"))
+            .values("pk", "updated_at", "lines_at", "lines_n")
+            .first()
         )
+        if stamp is None:
+            return Response({}, status=status.HTTP_200_OK)
+
+        key = cart_cache_key(stamp)
+        data = cache.get(key)
+
+        if data is None:
+            data = CartSerializer(Cart.objects.get(pk=stamp["pk"])).data
+            cache.set(key, data, CART_CACHE_TIMEOUT)
+
+        return Response(data, status=status.HTTP_200_OK)
 
     elif request.method == "DELETE":
         cid = request.query_params.get("id")
@@ -351,15 +159,34 @@ def cart_view(request):
 # OTHER SIMPLE VIEWS
 # ==========================================================
 def latest_order(request):
-    order = Order.objects.order_by("-created_at").first()
-    return JsonResponse({"id": order.id if order else None})
+    # Index-only read of the newest id — no full row hydration
+    order_id = (
+        Order.objects
+        .order_by("-created_at")
+        .values_list("id", flat=True)
+        .first()
+    )
+    return JsonResponse({"id": order_id})
 
 
 def kitchen_screen(request):
+    # Only the rendered columns; items land in a plain list (cached_items)
+    # so the template never triggers a fresh query per order
     orders = (
         Order.objects
-        .filter(status=Order.STATUS_PENDING)
-        .prefetch_related("order_items__prepared_item")
+        .filter(status=Order.STATUS_CONFIRMED)
+        .only("id", "order_number", "created_at", "status")
+        .prefetch_related(
+            Prefetch(
+                "order_items",
+                queryset=(
+                    OrderItem.objects
+                    .select_related("prepared_item")
+                    .only("id", "quantity", "order_id", "prepared_item__id", "prepared_item__name")
+                ),
+                to_attr="cached_items",
+            )
+        )
         .order_by("created_at")
     )
     return render(request, "orders/kitchen_screen.html", {"orders": orders})
@@ -382,17 +209,27 @@ def add_address(request):
     customer_id = request.data.get("customer_id")
     customer = get_object_or_404(Customer, id=customer_id)
 
-    if request.data.get("is_default"):
-        Address.objects.filter(customer=customer).update(is_default=False)
-
-    address = Address.objects.create(
-        customer=customer,
-        line1=request.data["line1"],
-        city=request.data["city"],
-        pincode=request.data["pincode"],
-        is_default=request.data.get("is_default", False),
+    # Form posts send "false"/"0" as strings, which bool() reads as True
+    is_default = serializers.BooleanField().to_internal_value(
+        request.data.get("is_default", False)
     )
 
+    # Clear + insert commit together, so the customer never ends up
+    # with zero (or, via one_default_addr, two) default addresses.
+    with transaction.atomic():
+        if is_default:
+            Address.objects.filter(
+                customer=customer, is_default=True
+            ).update(is_default=False)
+
+        address = Address.objects.create(
+            customer=customer,
+            line1=request.data["line1"],
+            city=request.data["city"],
+            pincode=request.data["pincode"],
+            is_default=is_default,
+        )
+
     return Response({"id": address.id}, status=status.HTTP_201_CREATED)
 
 
@@ -400,7 +237,6 @@ def add_address(request):
 # ORDER DETAIL (LEGACY)
 # ==========================================================
 def order_detail(request, order_id):
-    from .serializers import OrderReadSerializer
     order = get_object_or_404(
         Order.objects.prefetch_related(
             Prefetch(
@@ -1,10 +1,86 @@
 from django.contrib import admin
-from django.utils.html import format_html
-from django.db.models import Sum
-
+from django.contrib.admin.views.main import ChangeList
+from django.utils.html import escape
+from django.utils.safestring import mark_safe
+from django.core.paginator import Paginator
+from django.db import connections
+from django.db.models import Case, Value, When
+
+from .bulk import bulk_receive_batches, bulk_recompute_stock
 from .models import Snack, SnackBatch
 from django.urls import reverse
-from django.utils import timezone
+from django.utils.functional import cached_property
+
+
+# ======================================================
+# DISPLAY FRAGMENTS (BUILT ONCE)
+# ======================================================
+_THUMB_STYLE = "width:48px;height:48px;object-fit:cover;border-radius:6px;"
+_PREVIEW_STYLE = (
+    "width:140px;height:140px;object-fit:cover;border-radius:12px;"
+    "box-shadow:0 6px 16px rgba(0,0,0,.35);"
+)
+
+_STOCK_BADGES = {
+    label: mark_safe(f"<strong style='color:{color}'>{label}</strong>")
+    for label, color in (
+        ("Inactive", "#9e9e9e"),
+        ("Sold Out", "#e53935"),
+        ("Low", "#fb8c00"),
+        ("Available", "#43a047"),
+    )
+}
+
+
+def _img_tag(url, style):
+    # Only the URL is dynamic; escape it and splice into the static markup
+    return mark_safe(f"<img src='{escape(url)}' style='{style}'/>")
+
+
+# ======================================================
+# CHANGELIST (NARROW ROWS)
+# ======================================================
+class DeferringChangeList(ChangeList):
+    """
+    Changelist that skips the admin's `list_defer` columns.
+
+    Only the list page is narrowed; the change form still loads full rows.
+    """
+
+    def get_queryset(self, request, exclude_parameters=None):
+        qs = super().get_queryset(request, exclude_parameters)
+        return qs.defer(*self.model_admin.list_defer)
+
+
+class EstimatedCountPaginator(Paginator):
+    """
+    Paginator that reads the planner's row estimate instead of COUNT(*).
+
+    Only used for an unfiltered changelist on PostgreSQL, and only once the
+    table is large enough that an exact count is actually slow; otherwise
+    (filters, search, other backends, small tables) it counts normally.
+    """
+
+    ESTIMATE_THRESHOLD = 10_000
+
+    @cached_property
+    def count(self):
+        qs = self.object_list
+        db = getattr(qs, "db", None)
+        if db is None or connections[db].vendor != "postgresql" or qs.query.where:
+            return super().count
+
+        with connections[db].cursor() as cursor:
+            cursor.execute(
+                "SELECT reltuples::bigint FROM pg_class WHERE relname = %s",
+                [qs.model._meta.db_table],
+            )
+            row = cursor.fetchone()
+
+        estimate = row[0] if row else -1
+        if estimate < self.ESTIMATE_THRESHOLD:
+            return super().count
+        return estimate
 
 
 # ======================================================
@@ -59,6 +135,7 @@ class SnackAdmin(admin.ModelAdmin):
     ordering = ("-created_at",)
     list_per_page = 25
     show_full_result_count = False
+    paginator = EstimatedCountPaginator
 
     # ------------------------------
     # READONLY
@@ -73,78 +150,82 @@ class SnackAdmin(admin.ModelAdmin):
         "cost_per_pack_display",
         "margin_display",
         "stock_qty",
+        "stock_synced_at",
     )
 
     inlines = (SnackBatchInline,)
 
+    # Large text / JSON columns no list column reads
+    list_defer = ("description", "offers", "pairs_with")
+
+    def get_changelist(self, request, **kwargs):
+        return DeferringChangeList
+
+    def get_queryset(self, request):
+        # Cost and margin are stored columns (effective_cost_per_pack,
+        # margin_percent_cached); only the badge label is computed here
+        return super().get_queryset(request).annotate(
+            _stock_status=Case(
+                When(is_active=False, then=Value("Inactive")),
+                When(stock_qty__lte=0, then=Value("Sold Out")),
+                When(stock_qty__lte=5, then=Value("Low")),
+                default=Value("Available"),
+            ),
+        )
+
     # ==================================================
     # DISPLAY HELPERS (available on SnackAdmin)
     # ==================================================
 
     @admin.display(description="Image")
     def image_thumb(self, obj):
-        if not getattr(obj, 'image', None):
+        if not obj.image_url:
             return "—"
-        return format_html(
-            "<img src='{}' style='width:48px;height:48px;"
-            "object-fit:cover;border-radius:6px;'/>",
-            obj.image.url,
-        )
+        return _img_tag(obj.image_url, _THUMB_STYLE)
 
     @admin.display(description="Preview")
     def image_preview(self, obj):
-        if not getattr(obj, 'image', None):
+        if not obj.image_url:
             return "—"
-        return format_html(
-            "<img src='{}' style='width:140px;height:140px;"
-            "object-fit:cover;border-radius:12px;"
-            "box-shadow:0 6px 16px rgba(0,0,0,.35);'/>",
-            obj.image.url,
-        )
+        return _img_tag(obj.image_url, _PREVIEW_STYLE)
 
     @admin.display(description="Cost / pack")
     def cost_per_pack_display(self, obj):
-        try:
-            c = obj.cost_per_pack()
-            return f"₹{c:.2f}"
-        except Exception:
-            return "—"
+        return f"₹{obj.cost_per_pack():.2f}"
 
-    @admin.display(description="Margin %")
+    @admin.display(description="Margin %", ordering="margin_percent_cached")
     def margin_display(self, obj):
-        try:
-            m = obj.margin_percent
-            return f"{m:.1f}%" if m is not None else "—"
-        except Exception:
-            return "—"
+        m = obj.margin_percent_cached
+        return f"{m:.1f}%" if m is not None else "—"
 
     @admin.display(description="Buying")
     def mrq_buying(self, obj):
-        try:
-            return "₹{:.2f}".format(obj.buying_price)
-        except Exception:
-            return "—"
+        return f"₹{obj.buying_price:.2f}"
 
-    @admin.display(description="Stock")
+    @admin.display(description="Stock", ordering="stock_qty")
     def stock_status(self, obj):
+        if hasattr(obj, "_stock_status"):
+            return _STOCK_BADGES[obj._stock_status]
+
         if not obj.is_active:
-            return format_html("<strong style='color:#9e9e9e'>{}</strong>", "Inactive")
+            return _STOCK_BADGES["Inactive"]
 
         if obj.stock_qty <= 0:
-            return format_html("<strong style='color:#e53935'>{}</strong>", "Sold Out")
+            return _STOCK_BADGES["Sold Out"]
 
         if obj.stock_qty <= 5:
-            return format_html("<strong style='color:#fb8c00'>{}</strong>", "Low")
+            return _STOCK_BADGES["Low"]
 
-        return format_html("<strong style='color:#43a047'>{}</strong>", "Available")
+        return _STOCK_BADGES["Available"]
 
     @admin.display(description="Profit")
     def profit_display(self, obj):
-        try:
-            profit = float(obj.profit)
-            return format_html("<strong>₹{:.2f}</strong>", profit)
-        except Exception:
+        profit = obj.profit
+        if profit is None:
             return "—"
+        # Numeric, nothing to escape (escaping first would turn it into a
+        # str and break the :.2f spec)
+        return mark_safe(f"<strong>₹{profit:.2f}</strong>")
 
     # ------------------------------
     # FORM LAYOUT
@@ -212,6 +293,7 @@ class SnackAdmin(admin.ModelAdmin):
                     "uuid",
                     "created_at",
                     "updated_at",
+                    "stock_synced_at",
                 ),
                 "classes": ("collapse",),
             },
@@ -229,93 +311,29 @@ class SnackBatchAdmin(admin.ModelAdmin):
     search_fields = ("batch_code", "snack__name", "supplier_name")
     readonly_fields = ("cost_per_pack",)
 
-    actions = ("mark_as_received",)
-
-    @admin.action(description="Mark selected batches as received and add units to stock")
-    def mark_as_received(self, request, queryset):
-        updated = 0
-        for b in queryset:
-            if not b.received:
-                try:
-                    b.received = True
-                    b.received_date = b.received_date or timezone.now().date()
-                    b.save(update_fields=['received', 'received_date'])
-                    snack = b.snack
-                    snack.stock_qty = (snack.stock_qty or 0) + int(b.units_remaining)
-                    snack.save(update_fields=['stock_qty'])
-                    updated += 1
-                except Exception:
-                    continue
-        self.message_user(request, f"Marked {updated} batch(es) as received and updated stock.")
-
-    # ==================================================
-    # DISPLAY HELPERS
-    # ==================================================
+    # list_display renders `snack` (Snack.__str__) per row: JOIN it once
+    list_select_related = ("snack",)
 
-    @admin.display(description="Image")
-    def image_thumb(self, obj):
-        if not obj.image:
-            return "—"
-        return format_html(
-            "<img src='{}' style='width:48px;height:48px;"
-            "object-fit:cover;border-radius:6px;'/>",
-            obj.image.url,
-        )
+    # Plain id input instead of a <select> loading every snack
+    raw_id_fields = ("snack",)
 
-    @admin.display(description="Preview")
-    def image_preview(self, obj):
-        if not obj.image:
-            return "—"
-        return format_html(
-            "<img src='{}' style='width:140px;height:140px;"
-            "object-fit:cover;border-radius:12px;"
-            "box-shadow:0 6px 16px rgba(0,0,0,.35);'/>",
-            obj.image.url,
-        )
-
-    @admin.display(description="Cost / pack")
-    def cost_per_pack_display(self, obj):
-        try:
-            c = obj.cost_per_pack()
-            return f"₹{c:.2f}"
-        except Exception:
-            return "—"
-
-    @admin.display(description="Margin %")
-    def margin_display(self, obj):
-        try:
-            m = obj.margin_percent
-            return f"{m:.1f}%" if m is not None else "—"
-        except Exception:
-            return "—"
-
-    @admin.display(description="Stock")
-    def stock_status(self, obj):
-        if not obj.is_active:
-            return format_html("<strong style='color:#9e9e9e'>{}</strong>", "Inactive")
-
-        if obj.stock_qty <= 0:
-            return format_html("<strong style='color:#e53935'>{}</strong>", "Sold Out")
-
-        if obj.stock_qty <= 5:
-            return format_html("<strong style='color:#fb8c00'>{}</strong>", "Low")
+    actions = ("mark_as_received",)
 
-        return format_html("<strong style='color:#43a047'>{}</strong>", "Available")
+    list_defer = (
+        "notes",
+        "snack__description",
+        "snack__offers",
+        "snack__pairs_with",
+    )
 
-    @admin.display(description="Buying")
-    def mrq_buying(self, obj):
-        try:
-            return "₹{:.2f}".format(obj.buying_price)
-        except Exception:
-            return "—"
+    def get_changelist(self, request, **kwargs):
+        return DeferringChangeList
 
-    @admin.display(description="Profit")
-    def profit_display(self, obj):
-        try:
-            profit = float(obj.profit)
-            return format_html("<strong>₹{:.2f}</strong>", profit)
-        except Exception:
-            return "—"
+    @admin.action(description="Mark selected batches as received and add units to stock")
+    def mark_as_received(self, request, queryset):
+        # One UPDATE for the batches, one for their snacks' stock
+        updated = bulk_receive_batches(queryset)
+        self.message_user(request, f"Marked {updated} batch(es) as received and updated stock.")
 
     # ==================================================
     # SAFETY (AUDIT PRESERVATION)
@@ -331,19 +349,10 @@ class SnackBatchAdmin(admin.ModelAdmin):
 
 @admin.action(description="Resync stock for selected snacks from batches")
 def resync_stock(modeladmin, request, queryset):
-    updated = 0
-    for snack in queryset:
-        try:
-            total = snack.batches.filter(received=True).aggregate(Sum('units_remaining'))['units_remaining__sum'] or 0
-            total = int(total)
-            if snack.stock_qty != total:
-                snack.stock_qty = total
-                snack.save(update_fields=['stock_qty'])
-                updated += 1
-        except Exception:
-            continue
+    # One UPDATE ... SET stock_qty = (SELECT SUM(...)) for the whole selection
+    updated = bulk_recompute_stock(queryset.values_list("pk", flat=True))
     modeladmin.message_user(request, f"Resynced stock for {updated} snack(s).")
 
 
 # Attach action to SnackAdmin
-SnackAdmin.actions = getattr(SnackAdmin, 'actions', ()) + ('resync_stock',)
+SnackAdmin.actions = tuple(getattr(SnackAdmin, 'actions', ()) or ()) + (resync_stock,)
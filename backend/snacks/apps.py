@@ -5,3 +5,7 @@ class SnacksConfig(AppConfig):
     default_auto_field = "django.db.models.BigAutoField"
     name = "snacks"                # ✅ Python module
     verbose_name = "Retail Snacks" # ✅ Admin display name
+
+    def ready(self):
+        # SnackBatch save/delete → Snack.stock_qty (snacks/signals.py)
+        from . import signals  # noqa: F401
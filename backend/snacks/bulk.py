@@ -0,0 +1,54 @@
+from django.db import transaction
+from django.db.models import OuterRef, Value
+from django.db.models.functions import Coalesce
+from django.utils import timezone
+
+from .models import Snack, derived_columns, sync_combo_availability
+
+
+# ======================================================
+# SET-BASED STOCK MAINTENANCE
+# ======================================================
+
+def bulk_recompute_stock(snack_ids, using=None):
+    """
+    Recompute stock_qty and the derived pricing columns for many snacks,
+    then the availability of the combos containing them.
+
+    One UPDATE each with correlated aggregates, however many snacks are
+    passed. Returns the number of snacks updated.
+    """
+    ids = {pk for pk in snack_ids if pk is not None}
+    if not ids:
+        return 0
+
+    updated = (
+        Snack.objects
+        .using(using)
+        .filter(pk__in=ids)
+        .update(**derived_columns(OuterRef("pk")))
+    )
+    sync_combo_availability(snack_ids=ids, using=using)
+    return updated
+
+
+def bulk_receive_batches(batch_qs):
+    """
+    Mark every pending batch in `batch_qs` as received and refresh stock.
+
+    Runs as two statements (batch UPDATE + snack UPDATE) with no per-row
+    save() or signal. Returns the number of batches received.
+    """
+    pending = batch_qs.filter(received=False)
+
+    with transaction.atomic():
+        # Collected before the UPDATE empties `pending`
+        snack_ids = set(pending.values_list("snack_id", flat=True))
+
+        updated = pending.update(
+            received=True,
+            received_date=Coalesce("received_date", Value(timezone.now().date())),
+        )
+        bulk_recompute_stock(snack_ids)
+
+    return updated
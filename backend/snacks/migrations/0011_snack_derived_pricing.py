@@ -0,0 +1,54 @@
+# Generated by Django 5.2 on 2026-10-15 22:57
+
+from django.db import migrations, models
+from django.db.models import ExpressionWrapper, F, OuterRef, Subquery, Value
+from django.db.models.functions import Cast, Coalesce, NullIf
+
+
+def backfill_derived_pricing(apps, schema_editor):
+    Snack = apps.get_model("snacks", "Snack")
+    SnackBatch = apps.get_model("snacks", "SnackBatch")
+
+    latest_cost = Subquery(
+        SnackBatch.objects
+        .filter(snack=OuterRef("pk"), received=True)
+        .order_by("-produced_at")
+        .values("cost_per_pack")[:1]
+    )
+    cost = Coalesce(
+        "locked_cost_per_pack",
+        latest_cost,
+        "buying_price",
+        output_field=models.DecimalField(max_digits=10, decimal_places=2),
+    )
+    Snack.objects.update(
+        effective_cost_per_pack=cost,
+        margin_percent_cached=ExpressionWrapper(
+            # Float numerator: no integer division on backends that store
+            # whole-number decimals as integers (sqlite)
+            Cast(F("selling_price") - cost, models.FloatField()) * 100
+            / NullIf(cost, Value(0)),
+            output_field=models.FloatField(),
+        ),
+    )
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('snacks', '0010_snackcombo_snackcomboitem'),
+    ]
+
+    operations = [
+        migrations.AddField(
+            model_name='snack',
+            name='effective_cost_per_pack',
+            field=models.DecimalField(decimal_places=2, editable=False, help_text='Derived: locked cost → latest received batch → buying price', max_digits=10, null=True),
+        ),
+        migrations.AddField(
+            model_name='snack',
+            name='margin_percent_cached',
+            field=models.FloatField(editable=False, help_text='Derived from effective_cost_per_pack', null=True),
+        ),
+        migrations.RunPython(backfill_derived_pricing, migrations.RunPython.noop),
+    ]
@@ -0,0 +1,36 @@
+# Generated by Django 5.2 on 2026-10-15 23:00
+
+import snacks.models
+from django.db import migrations, models
+
+
+def create_pairs_with_gin(apps, schema_editor):
+    # GIN (jsonb containment) only exists on Postgres
+    if schema_editor.connection.vendor != "postgresql":
+        return
+    schema_editor.execute(
+        "CREATE INDEX IF NOT EXISTS snack_pairs_gin "
+        "ON snacks_snack USING gin (pairs_with)"
+    )
+
+
+def drop_pairs_with_gin(apps, schema_editor):
+    if schema_editor.connection.vendor != "postgresql":
+        return
+    schema_editor.execute("DROP INDEX IF EXISTS snack_pairs_gin")
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('snacks', '0011_snack_derived_pricing'),
+    ]
+
+    operations = [
+        migrations.AlterField(
+            model_name='snack',
+            name='pairs_with',
+            field=models.JSONField(default=snacks.models._empty_list, help_text="e.g. ['Idli', 'Sambar'] - items this snack pairs well with"),
+        ),
+        migrations.RunPython(create_pairs_with_gin, drop_pairs_with_gin),
+    ]
@@ -0,0 +1,17 @@
+# Generated by Django 5.2 on 2026-10-15 23:05
+
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('snacks', '0012_snack_pairs_with_gin'),
+    ]
+
+    operations = [
+        migrations.AddIndex(
+            model_name='snackbatch',
+            index=models.Index(fields=['snack', 'received', 'produced_at', 'units_remaining'], name='snackbatch_stock_idx'),
+        ),
+    ]
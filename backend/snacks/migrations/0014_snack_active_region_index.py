@@ -0,0 +1,17 @@
+# Generated by Django 5.2 on 2026-10-15 23:10
+
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('snacks', '0013_snackbatch_stock_index'),
+    ]
+
+    operations = [
+        migrations.AddIndex(
+            model_name='snack',
+            index=models.Index(condition=models.Q(('is_active', True)), fields=['region'], name='snack_active_region_idx'),
+        ),
+    ]
@@ -0,0 +1,32 @@
+# Generated by Django 5.2 on 2026-10-15 23:13
+
+from django.db import migrations, models
+
+
+def backfill_snacks_available(apps, schema_editor):
+    SnackCombo = apps.get_model("snacks", "SnackCombo")
+    SnackComboItem = apps.get_model("snacks", "SnackComboItem")
+
+    SnackCombo.objects.update(
+        snacks_available=~models.Exists(
+            SnackComboItem.objects
+            .filter(combo=models.OuterRef("pk"))
+            .filter(models.Q(snack__is_active=False) | models.Q(snack__stock_qty__lte=0))
+        )
+    )
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('snacks', '0014_snack_active_region_index'),
+    ]
+
+    operations = [
+        migrations.AddField(
+            model_name='snackcombo',
+            name='snacks_available',
+            field=models.BooleanField(db_index=True, default=True, editable=False),
+        ),
+        migrations.RunPython(backfill_snacks_available, migrations.RunPython.noop),
+    ]
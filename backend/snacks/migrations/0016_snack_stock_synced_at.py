@@ -0,0 +1,18 @@
+# Generated by Django 5.2 on 2026-10-15 23:31
+
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('snacks', '0015_snackcombo_snacks_available'),
+    ]
+
+    operations = [
+        migrations.AddField(
+            model_name='snack',
+            name='stock_synced_at',
+            field=models.DateTimeField(editable=False, null=True),
+        ),
+    ]
@@ -0,0 +1,21 @@
+# Generated by Django 5.2 on 2026-10-15 23:45
+
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('snacks', '0016_snack_stock_synced_at'),
+    ]
+
+    operations = [
+        migrations.AddIndex(
+            model_name='snack',
+            index=models.Index(fields=['updated_at'], name='snack_updated_idx'),
+        ),
+        migrations.AddIndex(
+            model_name='snack',
+            index=models.Index(fields=['stock_synced_at'], name='snack_stock_synced_idx'),
+        ),
+    ]
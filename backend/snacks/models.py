@@ -6,16 +6,23 @@ import uuid
 from decimal import Decimal, ROUND_HALF_UP
 
 from django.db import models
+from django.db.models import ExpressionWrapper, F, Subquery, Value
+from django.db.models.functions import Cast, Coalesce, NullIf
 from django.core.validators import MinValueValidator
 from django.core.exceptions import ValidationError
 from django.utils import timezone
-from django.db.models.signals import post_save, post_delete
-from django.dispatch import receiver
+from django.utils.functional import cached_property
+
+from core.utils import generate_and_set_code
 
 ZERO = Decimal("0.00")
 Q2 = Decimal("0.01")
 
 
+def _empty_list():
+    return []
+
+
 # ======================================================
 # BASE MODEL (SHARED)
 # ======================================================
@@ -40,13 +47,25 @@ class BaseModel(models.Model):
 
     def soft_delete(self):
         self.is_active = False
-        self.save(update_fields=["is_active"])
+        # updated_at too: catalog_stamp only sees edits through it
+        self.save(update_fields=["is_active", "updated_at"])
 
 
 # ======================================================
 # SNACK (READY-TO-SELL PRODUCT)
 # ======================================================
 
+PRICING_FIELDS = frozenset({"locked_cost_per_pack", "buying_price", "selling_price"})
+DERIVED_PRICING_FIELDS = ("effective_cost_per_pack", "margin_percent_cached")
+
+
+def margin_for(selling_price, cost):
+    """Margin % over cost; None when unpriced or cost is zero."""
+    if selling_price is None or not cost:
+        return None
+    return float(((selling_price - cost) / cost) * 100)
+
+
 class Snack(BaseModel):
     """
     Ready-made packaged snack.
@@ -165,6 +184,28 @@ class Snack(BaseModel):
         help_text="Derived from received SnackBatches"
     )
 
+    # ---------- PRICING (DERIVED) ----------
+    effective_cost_per_pack = models.DecimalField(
+        max_digits=10,
+        decimal_places=2,
+        null=True,
+        editable=False,
+        help_text="Derived: locked cost → latest received batch → buying price"
+    )
+
+    margin_percent_cached = models.FloatField(
+        null=True,
+        editable=False,
+        help_text="Derived from effective_cost_per_pack"
+    )
+
+    # Last batch-driven recompute; kept apart from updated_at, which
+    # records the last edit of the snack itself
+    stock_synced_at = models.DateTimeField(
+        null=True,
+        editable=False,
+    )
+
     # ---------- FLAGS ----------
     is_veg = models.BooleanField(default=True)
     is_spicy = models.BooleanField(default=False)
@@ -177,22 +218,35 @@ class Snack(BaseModel):
     )
 
     # ---------- PAIRING SUGGESTIONS ----------
+    # GIN-indexed on Postgres for pairs_with__contains lookups
+    # (migration 0013; sqlite has no GIN, so the index is not in Meta)
     pairs_with = models.JSONField(
-        default=list,
+        default=_empty_list,
         help_text="e.g. ['Idli', 'Sambar'] - items this snack pairs well with"
     )
 
     class Meta:
         ordering = ["name"]
         unique_together = ("name", "weight_label")
+        indexes = [
+            # regions action: DISTINCT region over active snacks only
+            models.Index(
+                fields=["region"],
+                condition=models.Q(is_active=True),
+                name="snack_active_region_idx",
+            ),
+            # catalog_stamp: MAX() of each is read off the end of its index
+            models.Index(fields=["updated_at"], name="snack_updated_idx"),
+            models.Index(fields=["stock_synced_at"], name="snack_stock_synced_idx"),
+        ]
 
     def __str__(self):
         return self.name
 
     def save(self, *args, **kwargs):
-        from core.utils import generate_and_set_code
-
-        if not getattr(self, 'code', None):
+        # Rows that already have a code (every stock / pricing re-save)
+        # skip generation entirely
+        if not self.code:
             for _ in range(3):
                 try:
                     generate_and_set_code(self, "SN", "code", 4)
@@ -200,8 +254,23 @@ class Snack(BaseModel):
                 except Exception:
                     continue
 
+        # Pricing fields may have changed: drop memoized cost / profit
+        self.__dict__.pop("_cpp_cache", None)
+        self.__dict__.pop("profit", None)
+
+        update_fields = kwargs.get("update_fields")
+        if update_fields is None or PRICING_FIELDS.intersection(update_fields):
+            cost = self._compute_cost_per_pack()
+            self.effective_cost_per_pack = cost
+            self.margin_percent_cached = margin_for(self.selling_price, cost)
+            if update_fields is not None:
+                kwargs["update_fields"] = {*update_fields, *DERIVED_PRICING_FIELDS}
+
         super().save(*args, **kwargs)
 
+        # Storage may rename the upload on save
+        self.__dict__.pop("image_url", None)
+
     # ---------- VALIDATION ----------
     def clean(self):
         if not self.pack_size:
@@ -229,27 +298,39 @@ class Snack(BaseModel):
         1) locked_cost_per_pack
         2) latest received batch cost
         3) buying_price
+
+        Read from the stored effective_cost_per_pack (kept current by
+        save() and sync_snack_stock); memoized per instance.
         """
+        if "_cpp_cache" not in self.__dict__:
+            cost = self.effective_cost_per_pack
+            if cost is None:
+                cost = self._compute_cost_per_pack()
+            self.__dict__["_cpp_cache"] = cost
+        return self.__dict__["_cpp_cache"]
+
+    def _compute_cost_per_pack(self) -> Decimal:
         if self.locked_cost_per_pack is not None:
             return self.locked_cost_per_pack
 
-        batch = self.latest_batch
+        # A row being created has no batches yet
+        batch = None if self._state.adding else self.latest_batch
         if batch and batch.cost_per_pack is not None:
             return batch.cost_per_pack
 
         return self.buying_price or ZERO
 
     # ---------- PROFIT & AVAILABILITY ----------
-    @property
-    def profit(self) -> Decimal:
+    @cached_property
+    def profit(self):
+        # None on an unsaved, unpriced row (admin add form)
+        if self.selling_price is None:
+            return None
         return (self.selling_price - self.cost_per_pack()).quantize(Q2)
 
     @property
     def margin_percent(self):
-        cost = self.cost_per_pack()
-        if cost == 0:
-            return None
-        return float(((self.selling_price - cost) / cost) * 100)
+        return margin_for(self.selling_price, self.cost_per_pack())
 
     @property
     def is_available(self):
@@ -263,8 +344,10 @@ class Snack(BaseModel):
             return "Sold Out"
         return "Available"
 
-    @property
+    @cached_property
     def image_url(self):
+        # Storage.url() can mean string building or signing (S3/GCS):
+        # resolve once per instance
         return self.image.url if self.image else None
 
 
@@ -321,6 +404,17 @@ class SnackBatch(models.Model):
 
     class Meta:
         ordering = ["-produced_at"]
+        indexes = [
+            # latest_batch (newest first, backward scan), FIFO consumption
+            # (oldest first) and the received-stock aggregate. Trailing
+            # units_remaining makes SUM(units_remaining) an index-only scan
+            # (a key column rather than INCLUDE: sqlite has no covering
+            # indexes)
+            models.Index(
+                fields=["snack", "received", "produced_at", "units_remaining"],
+                name="snackbatch_stock_idx",
+            ),
+        ]
 
     def __str__(self):
         return f"{self.snack.name} — {self.batch_code or str(self.id)[:8]}"
@@ -337,42 +431,124 @@ class SnackBatch(models.Model):
             if not self.units_remaining:
                 self.units_remaining = self.packs_produced
 
-        super().save(*args, **kwargs)
-
+        # Backfill before the write: one save, one post_save
         if self.received and not self.received_date:
             self.received_date = timezone.now().date()
-            super().save(update_fields=["received_date"])
+            update_fields = kwargs.get("update_fields")
+            if update_fields is not None and "received_date" not in update_fields:
+                kwargs["update_fields"] = [*update_fields, "received_date"]
+
+        super().save(*args, **kwargs)
 
     # ---------- CONSUME ----------
     def consume(self, qty: int):
         if qty <= 0:
             return
-        if self.units_remaining < qty:
+
+        # Guarded decrement in SQL: concurrent consumers can't oversell or
+        # lose each other's updates
+        updated = SnackBatch.objects.filter(
+            pk=self.pk, units_remaining__gte=qty
+        ).update(units_remaining=models.F("units_remaining") - qty)
+        if not updated:
             raise ValidationError("Insufficient batch stock")
+
         self.units_remaining -= qty
-        self.save(update_fields=["units_remaining"])
+
+        # update() sends no post_save; keep Snack.stock_qty in step
+        sync_snack_stock(self.snack_id)
 
 
 # ======================================================
-# SIGNAL: RECOMPUTE SNACK STOCK
+# DERIVED STOCK (SQL)
 # ======================================================
 
-@receiver(post_save, sender=SnackBatch)
-@receiver(post_delete, sender=SnackBatch)
-def recompute_snack_stock(sender, instance, **kwargs):
-    snack = instance.snack
-    total = (
-        snack.batches
-        .filter(received=True)
-        .aggregate(models.Sum("units_remaining"))
-        .get("units_remaining__sum")
-        or 0
+def received_stock(snack):
+    """
+    SUM(units_remaining) over received batches, 0 when there are none.
+
+    `snack` is a pk or an OuterRef("pk"), so the same expression drives
+    single-row and queryset-wide stock_qty UPDATEs.
+    """
+    return Coalesce(
+        Subquery(
+            SnackBatch.objects
+            .filter(snack=snack, received=True)
+            .values("snack")
+            .annotate(total=models.Sum("units_remaining"))
+            .values("total")
+        ),
+        Value(0),
+    )
+
+
+def next_expiry(snack):
+    """
+    expiry_date of the next FIFO batch (see Snack.next_consumable_batch).
+
+    `snack` is a pk or an OuterRef("pk"); annotate list querysets with it
+    instead of calling next_consumable_batch() per row.
+    """
+    return Subquery(
+        SnackBatch.objects
+        .filter(snack=snack, received=True, units_remaining__gt=0)
+        .order_by("produced_at")
+        .values("expiry_date")[:1]
+    )
+
+
+def snack_profit():
+    """
+    Snack.profit in SQL. Annotate it AS "profit": the value lands in the
+    instance __dict__, which is exactly where the cached_property reads.
+    """
+    return ExpressionWrapper(
+        F("selling_price")
+        - Coalesce("effective_cost_per_pack", "locked_cost_per_pack", "buying_price"),
+        output_field=models.DecimalField(max_digits=10, decimal_places=2),
     )
 
-    total = int(total)
-    if snack.stock_qty != total:
-        snack.stock_qty = total
-        snack.save(update_fields=["stock_qty"])
+
+def derived_columns(snack):
+    """
+    UPDATE assignments for every batch-derived Snack column.
+
+    `snack` is a pk or an OuterRef("pk"). The cost follows the same
+    precedence as Snack._compute_cost_per_pack().
+    """
+    latest_cost = Subquery(
+        SnackBatch.objects
+        .filter(snack=snack, received=True)
+        .order_by("-produced_at")
+        .values("cost_per_pack")[:1]
+    )
+    cost = Coalesce(
+        "locked_cost_per_pack",
+        latest_cost,
+        "buying_price",
+        output_field=models.DecimalField(max_digits=10, decimal_places=2),
+    )
+    return {
+        "stock_qty": received_stock(snack),
+        "effective_cost_per_pack": cost,
+        "margin_percent_cached": ExpressionWrapper(
+            # Float numerator: no integer division on backends that store
+            # whole-number decimals as integers (sqlite)
+            Cast(F("selling_price") - cost, models.FloatField()) * 100
+            / NullIf(cost, Value(0)),
+            output_field=models.FloatField(),
+        ),
+        # Not updated_at (the edit audit); the cached snack list is keyed
+        # on both
+        "stock_synced_at": timezone.now(),
+    }
+
+
+def sync_snack_stock(snack_id):
+    # Single UPDATE with the aggregates inlined: no SELECT round-trip and no
+    # Snack.save() (code generation, Snack post_save receivers)
+    Snack.objects.filter(pk=snack_id).update(**derived_columns(snack_id))
+    sync_combo_availability(snack_ids=[snack_id])
 
 
 # ======================================================
@@ -407,6 +583,11 @@ class SnackCombo(BaseModel):
     # ---------- FLAGS ----------
     is_featured = models.BooleanField(default=False)
 
+    # ---------- DERIVED (MAINTAINED) ----------
+    # Every item's snack active and in stock. Kept current by
+    # sync_combo_availability() from stock syncs and snack / item signals.
+    snacks_available = models.BooleanField(default=True, db_index=True, editable=False)
+
     class Meta:
         ordering = ["name"]
 
@@ -414,25 +595,24 @@ class SnackCombo(BaseModel):
         return self.name
 
     def save(self, *args, **kwargs):
-        from core.utils import generate_and_set_code
+        super().save(*args, **kwargs)
 
-        if not getattr(self, 'code', None):
-            for _ in range(3):
-                try:
-                    generate_and_set_code(self, "CB", "code", 4)
-                    break
-                except Exception:
-                    continue
+        # Derived from the pk once the row exists: unique in one shot, with
+        # no last-code SELECT to race on. Set via update() so the row is not
+        # saved (and signalled) twice.
+        if not self.code:
+            self.code = f"CB-{self.pk:04d}"
+            SnackCombo.objects.filter(pk=self.pk).update(code=self.code)
 
-        super().save(*args, **kwargs)
+        # Storage may rename the upload on save; items may have been
+        # edited alongside (admin inlines)
+        self.__dict__.pop("image_url", None)
+        self.__dict__.pop("item_list", None)
 
     @property
     def is_available(self):
         """Combo is available if all constituent snacks are available and active."""
-        return (
-            self.is_active and
-            all(item.snack.is_available for item in self.items.all())
-        )
+        return self.is_active and self.snacks_available
 
     @property
     def availability_status(self):
@@ -445,10 +625,24 @@ class SnackCombo(BaseModel):
     @property
     def total_items(self):
         """Total number of individual snack packs in this combo."""
-        return sum(item.quantity for item in self.items.all())
+        return sum(item.quantity for item in self.item_list)
 
-    @property
+    @cached_property
+    def item_list(self):
+        """
+        Items with their snacks, loaded once per instance.
+
+        Reuses a prefetch of "items" when present (SnackComboViewSet);
+        otherwise one JOINed query shared by every derived property.
+        """
+        if "items" in getattr(self, "_prefetched_objects_cache", {}):
+            return list(self.items.all())
+        return list(self.items.select_related("snack"))
+
+    @cached_property
     def image_url(self):
+        # Storage.url() can mean string building or signing (S3/GCS):
+        # resolve once per instance
         return self.image.url if self.image else None
 
 
@@ -488,6 +682,62 @@ class SnackComboItem(models.Model):
     def __str__(self):
         return f"{self.combo.name} — {self.quantity}x {self.snack.name}"
 
+    @property
+    def display_text(self):
+        """
+        Quantity + snack name (+ pack_size if available).
+
+        Rendered on read so it is never stale after a queryset update of
+        the snack or quantity; list views select_related the snack.
+        """
+        text = f"{self.quantity} {self.snack.name}"
+        if self.snack.pack_size:
+            return f"{text} ({self.snack.pack_size})"
+        return text
+
     def clean(self):
         if self.quantity < 1:
             raise ValidationError("Quantity must be at least 1")
+
+
+# ======================================================
+# DERIVED COMBO AVAILABILITY (SQL)
+# ======================================================
+
+def combo_snacks_available(combo):
+    """
+    True when no item of the combo has an inactive or out-of-stock snack.
+
+    `combo` is a pk or an OuterRef("pk"). A combo with no items counts as
+    available.
+    """
+    return ~models.Exists(
+        SnackComboItem.objects.filter(combo=combo).filter(
+            models.Q(snack__is_active=False) | models.Q(snack__stock_qty__lte=0)
+        )
+    )
+
+
+def sync_combo_availability(snack_ids=None, combo_ids=None, using=None):
+    """
+    Refresh SnackCombo.snacks_available for combos containing any of
+    `snack_ids` and/or listed in `combo_ids`, in one UPDATE.
+    """
+    scope = models.Q()
+    if snack_ids:
+        scope |= models.Q(
+            pk__in=SnackComboItem.objects
+            .filter(snack_id__in=snack_ids)
+            .values("combo_id")
+        )
+    if combo_ids:
+        scope |= models.Q(pk__in=combo_ids)
+    if not scope:
+        return 0
+
+    return (
+        SnackCombo.objects
+        .using(using)
+        .filter(scope)
+        .update(snacks_available=combo_snacks_available(models.OuterRef("pk")))
+    )
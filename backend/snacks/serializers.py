@@ -1,11 +1,79 @@
+from functools import lru_cache
+
 from rest_framework import serializers
+
+from core.serializers import SerializerCacheMixin
 from .models import Snack, SnackCombo, SnackComboItem
 
 
+# ======================================================
+# ABSOLUTE MEDIA URLS
+# ======================================================
+def abs_url(context, url):
+    """
+    Absolute form of a storage URL, or None.
+
+    The scheme + host prefix is resolved once per request and kept in the
+    serializer context, so list rows only concatenate.
+    """
+    if not url:
+        return None
+
+    request = context.get("request")
+    if request is None:
+        return url
+
+    # Host-relative paths (FileSystemStorage) take the fast path; absolute
+    # (S3/GCS) or protocol-relative URLs keep Django's own resolution
+    if not url.startswith("/") or url.startswith("//"):
+        return request.build_absolute_uri(url)
+
+    base = context.get("_abs_url_base")
+    if base is None:
+        base = context["_abs_url_base"] = request.build_absolute_uri("/")[:-1]
+    return base + url
+
+
+# ======================================================
+# SNACK MINIMAL SERIALIZER — PRIMITIVE COLUMNS ONLY
+# ======================================================
+class SnackMinimalSerializer(SerializerCacheMixin, serializers.ModelSerializer):
+    """
+    Plain model columns, no method fields (`?minimal=1` on the list).
+
+    Nothing here touches storage, batches or request, so the view can
+    load exactly these columns with `.only(*Meta.fields)`.
+    """
+
+    class Meta:
+        model = Snack
+        fields = (
+            "id",
+            "uuid",
+            "name",
+            "category",
+            "region",
+            "weight_label",
+            "pack_size",
+            "selling_price",
+            "mrp",
+            "stock_qty",
+            "min_order_qty",
+            "is_veg",
+            "is_spicy",
+            "is_featured",
+            "is_active",
+            "is_best_buy",
+            "badge_text",
+        )
+
+        read_only_fields = fields
+
+
 # ======================================================
 # SNACK SERIALIZER — FRONTEND CONTRACT SAFE
 # ======================================================
-class SnackSerializer(serializers.ModelSerializer):
+class SnackSerializer(SnackMinimalSerializer):
     """
     Read-only serializer for packaged snacks.
 
@@ -25,9 +93,8 @@ class SnackSerializer(serializers.ModelSerializer):
     is_available = serializers.ReadOnlyField()
     availability_status = serializers.ReadOnlyField()
 
-    profit = serializers.SerializerMethodField()
-    average_rating = serializers.SerializerMethodField()
-    review_count = serializers.SerializerMethodField()
+    # Snack.profit (SQL-annotated by SnackViewSet); numeric for frontend
+    profit = serializers.FloatField(read_only=True)
     expiry_date = serializers.SerializerMethodField()
 
     class Meta:
@@ -83,8 +150,6 @@ class SnackSerializer(serializers.ModelSerializer):
             "is_available",
             "availability_status",
             "profit",
-            "average_rating",
-            "review_count",
             "expiry_date",
         )
 
@@ -101,13 +166,7 @@ class SnackSerializer(serializers.ModelSerializer):
 
         Never returns broken paths.
         """
-        if not obj.image:
-            return None
-
-        request = self.context.get("request")
-        url = obj.image.url
-
-        return request.build_absolute_uri(url) if request else url
+        return abs_url(self.context, obj.image_url)
 
     def get_thumbnail_url(self, obj):
         """Return thumbnail URL (smaller version for lists/cards)"""
@@ -120,33 +179,21 @@ class SnackSerializer(serializers.ModelSerializer):
 
     def get_animated_image(self, obj):
         """Return absolute animated image URL or None."""
-        if not getattr(obj, "animated_image", None):
+        if not obj.animated_image:
             return None
-        request = self.context.get("request")
-        url = obj.animated_image.url
-        return request.build_absolute_uri(url) if request else url
-
-    # --------------------------------------------------
-    # PROFIT (FLOAT-SAFE FOR FRONTEND)
-    # --------------------------------------------------
-    def get_profit(self, obj):
-        """
-        Frontend-safe numeric profit.
-        """
-        try:
-            return float(obj.profit)
-        except Exception:
-            return 0.0
+        return abs_url(self.context, obj.animated_image.url)
 
     # --------------------------------------------------
     # REVIEWS (PLACEHOLDER — SAFE DEFAULTS)
     # --------------------------------------------------
-    def get_average_rating(self, obj):
-        # Review system not implemented yet
-        return 0.0
+    # Review system not implemented yet: constants merged in after field
+    # serialization instead of two method-field calls per row
+    REVIEW_PLACEHOLDERS = {"average_rating": 0.0, "review_count": 0}
 
-    def get_review_count(self, obj):
-        return 0
+    def to_representation(self, instance):
+        data = super().to_representation(instance)
+        data.update(self.REVIEW_PLACEHOLDERS)
+        return data
 
     # --------------------------------------------------
     # EXPIRY DATE (FROM NEXT CONSUMABLE BATCH)
@@ -155,16 +202,35 @@ class SnackSerializer(serializers.ModelSerializer):
         """
         Return expiry date from the next consumable batch (FIFO).
         Returns date string in YYYY-MM-DD format or None.
+
+        Uses the `next_expiry` annotation (SnackViewSet) when present.
         """
-        batch = obj.next_consumable_batch()
-        if batch and batch.expiry_date:
-            return batch.expiry_date.isoformat()
-        return None
+        if hasattr(obj, "next_expiry"):
+            expiry = obj.next_expiry
+        else:
+            batch = obj.next_consumable_batch()
+            expiry = batch.expiry_date if batch else None
+        return expiry.isoformat() if expiry else None
 
 
 # ======================================================
 # SNACK COMBO ITEM SERIALIZER
 # ======================================================
+@lru_cache(maxsize=256)
+def unit_for(pack_size):
+    """
+    Display unit for a pack_size label ("200g" → "g", "1L" → "ml").
+
+    Few distinct labels exist, so each is classified once per process.
+    """
+    pack_size = pack_size.lower()
+    if "g" in pack_size:  # g, kg
+        return "g"
+    if "l" in pack_size:  # ml, l
+        return "ml"
+    return "pcs"
+
+
 class SnackComboItemSerializer(serializers.ModelSerializer):
     """
     Serializer for individual items within a combo.
@@ -173,8 +239,8 @@ class SnackComboItemSerializer(serializers.ModelSerializer):
     """
 
     name = serializers.CharField(source="snack.name", read_only=True)
-    unit = serializers.SerializerMethodField()
-    display_text = serializers.SerializerMethodField()
+    unit = serializers.CharField(read_only=True)
+    display_text = serializers.CharField(read_only=True)
 
     class Meta:
         model = SnackComboItem
@@ -187,28 +253,25 @@ class SnackComboItemSerializer(serializers.ModelSerializer):
         )
         read_only_fields = fields
 
-    def get_unit(self, obj):
-        """Derive unit from snack pack_size or default to pcs."""
-        pack_size = obj.snack.pack_size.lower() if obj.snack.pack_size else ""
-        if "g" in pack_size or "kg" in pack_size:
-            return "g"
-        elif "ml" in pack_size or "l" in pack_size:
-            return "ml"
-        else:
-            return "pcs"
-
-    def get_display_text(self, obj):
-        """Generate display text: quantity + name (+ pack_size if available)."""
-        base_text = f"{obj.quantity} {obj.snack.name}"
-        if obj.snack.pack_size:
-            return f"{base_text} ({obj.snack.pack_size})"
-        return base_text
+    def to_representation(self, obj):
+        # Runs for every item of every combo: five fixed keys built
+        # directly instead of through the per-field pipeline. The declared
+        # fields above are kept only for schema generation and are never
+        # bound here, hence no SerializerCacheMixin.
+        snack = obj.snack
+        return {
+            "id": obj.id,
+            "name": snack.name,
+            "quantity": obj.quantity,
+            "unit": unit_for(snack.pack_size or ""),
+            "display_text": obj.display_text,
+        }
 
 
 # ======================================================
 # SNACK COMBO SERIALIZER
 # ======================================================
-class SnackComboSerializer(serializers.ModelSerializer):
+class SnackComboSerializer(SerializerCacheMixin, serializers.ModelSerializer):
     """
     Read-only serializer for snack combo bundles.
 
@@ -285,10 +348,4 @@ class SnackComboSerializer(serializers.ModelSerializer):
 
         Never returns broken paths.
         """
-        if not obj.image:
-            return None
-
-        request = self.context.get("request")
-        url = obj.image.url
-
-        return request.build_absolute_uri(url) if request else url
+        return abs_url(self.context, obj.image_url)
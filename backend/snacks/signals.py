@@ -0,0 +1,88 @@
+from functools import partial
+
+from django.core.cache import cache
+from django.db import connections, transaction
+from django.db.models.signals import post_delete, post_save
+from django.dispatch import receiver
+
+from .bulk import bulk_recompute_stock
+from .models import Snack, SnackBatch, SnackComboItem, sync_combo_availability
+from .views import CATALOG_DELETES_KEY
+
+
+# ======================================================
+# SIGNAL: RECOMPUTE SNACK STOCK (DEBOUNCED)
+# ======================================================
+
+def _pending(using):
+    # Snacks touched in the current transaction. Kept on the connection
+    # object: per database alias and per thread, like the transaction itself
+    conn = connections[using]
+    if not hasattr(conn, "_pending_snack_recompute"):
+        conn._pending_snack_recompute = set()
+    return conn._pending_snack_recompute
+
+
+def _flush_pending(using):
+    pending = _pending(using)
+    snack_ids = set(pending)
+    pending.clear()
+    bulk_recompute_stock(snack_ids, using=using)
+
+
+@receiver(post_save, sender=SnackBatch)
+@receiver(post_delete, sender=SnackBatch)
+def recompute_snack_stock(sender, instance, using, **kwargs):
+    # N batch writes in one transaction → one UPDATE at commit.
+    # Registered on every call: the first callback to run flushes the whole
+    # set and the rest find it empty (a once-only guard would be left stuck
+    # by a rollback, which discards callbacks). Outside atomic() it runs
+    # immediately.
+    _pending(using).add(instance.snack_id)
+    transaction.on_commit(partial(_flush_pending, using), using=using)
+
+
+# ======================================================
+# SIGNAL: COMBO AVAILABILITY
+# ======================================================
+
+# Snack fields SnackCombo.snacks_available depends on
+COMBO_AVAILABILITY_FIELDS = frozenset({"is_active", "stock_qty"})
+
+
+@receiver(post_save, sender=Snack)
+def snack_combo_availability(sender, instance, created, update_fields, using, **kwargs):
+    # A new snack is in no combo yet
+    if created:
+        return
+    if update_fields is not None and not COMBO_AVAILABILITY_FIELDS.intersection(update_fields):
+        return
+    transaction.on_commit(
+        partial(sync_combo_availability, snack_ids=[instance.pk], using=using),
+        using=using,
+    )
+
+
+@receiver(post_save, sender=SnackComboItem)
+@receiver(post_delete, sender=SnackComboItem)
+def combo_item_availability(sender, instance, using, **kwargs):
+    transaction.on_commit(
+        partial(sync_combo_availability, combo_ids=[instance.combo_id], using=using),
+        using=using,
+    )
+
+
+# ======================================================
+# SIGNAL: CATALOG STAMP (DELETES)
+# ======================================================
+
+def _bump_catalog_deletes():
+    cache.add(CATALOG_DELETES_KEY, 0, None)
+    cache.incr(CATALOG_DELETES_KEY)
+
+
+@receiver(post_delete, sender=Snack)
+def snack_catalog_deleted(sender, instance, using, **kwargs):
+    # A removed row can't move Max(updated_at). Bumped on commit, so a
+    # request racing the delete can't cache the old list under the new stamp
+    transaction.on_commit(_bump_catalog_deletes, using=using)
@@ -1,3 +1,333 @@
+import unittest
+from decimal import Decimal
+from unittest import mock
+
+from django.contrib.auth import get_user_model
+from django.core.cache import cache
+from django.db import connection, transaction
 from django.test import TestCase
+from django.test.utils import CaptureQueriesContext
+from rest_framework.test import APIClient
+
+from core.tests.utils import MigrationTestCase
+from snacks.admin import EstimatedCountPaginator
+from snacks.models import Snack, SnackBatch, SnackCombo, SnackComboItem
+
+
+class SnackTestCase(TestCase):
+    def setUp(self):
+        cache.clear()
+        self.client = APIClient()
+        self.snack = Snack.objects.create(
+            name="Murukku",
+            selling_price=Decimal("50"),
+            buying_price=Decimal("30"),
+            mrp=Decimal("60"),
+        )
+
+    def receive_batch(self, snack=None, packs=4, **kwargs):
+        # The stock recompute runs on commit
+        with self.captureOnCommitCallbacks(execute=True):
+            return SnackBatch.objects.create(
+                snack=snack or self.snack,
+                batch_cost=Decimal("100"),
+                packs_produced=packs,
+                received=True,
+                **kwargs
+            )
+
+
+# ======================================================
+# STOCK RECOMPUTE
+# ======================================================
+
+class StockRecomputeTests(SnackTestCase):
+    def test_batch_sync_keeps_edit_timestamp(self):
+        edited_at = self.snack.updated_at
+
+        self.receive_batch()
+
+        self.snack.refresh_from_db()
+        self.assertEqual(self.snack.stock_qty, 4)
+        self.assertEqual(self.snack.updated_at, edited_at)
+        self.assertIsNotNone(self.snack.stock_synced_at)
+
+    def test_batches_in_one_transaction_recompute_once(self):
+        with CaptureQueriesContext(connection) as queries:
+            with self.captureOnCommitCallbacks(execute=True):
+                with transaction.atomic():
+                    for _ in range(5):
+                        SnackBatch.objects.create(
+                            snack=self.snack,
+                            batch_cost=Decimal("100"),
+                            packs_produced=2,
+                            received=True,
+                        )
+
+        updates = [
+            q for q in queries.captured_queries
+            if q["sql"].startswith('UPDATE "snacks_snack"')
+        ]
+        self.assertEqual(len(updates), 1)
+        self.snack.refresh_from_db()
+        self.assertEqual(self.snack.stock_qty, 10)
+
+    def test_rolled_back_batches_leave_stock(self):
+        with self.captureOnCommitCallbacks(execute=True):
+            try:
+                with transaction.atomic():
+                    SnackBatch.objects.create(
+                        snack=self.snack,
+                        batch_cost=Decimal("100"),
+                        packs_produced=4,
+                        received=True,
+                    )
+                    raise RuntimeError
+            except RuntimeError:
+                pass
+
+        self.snack.refresh_from_db()
+        self.assertEqual(self.snack.stock_qty, 0)
+
+
+# ======================================================
+# SNACK LIST CACHE
+# ======================================================
+
+class SnackListCacheTests(SnackTestCase):
+    url = "/api/snacks/snacks/"
+
+    def names(self):
+        return [snack["name"] for snack in self.client.get(self.url).json()]
+
+    def test_hit_runs_only_the_stamp_query(self):
+        self.names()
+
+        with self.assertNumQueries(1):
+            self.assertEqual(self.names(), ["Murukku"])
+
+    def test_edit_invalidates(self):
+        self.names()
+
+        self.snack.name = "Thenkuzhal"
+        self.snack.save()
+
+        self.assertEqual(self.names(), ["Thenkuzhal"])
+
+    def test_batch_receive_invalidates(self):
+        stock = lambda: self.client.get(self.url).json()[0]["stock_qty"]
+        self.assertEqual(stock(), 0)
+
+        self.receive_batch()
+
+        self.assertEqual(stock(), 4)
+
+    def test_deactivate_and_delete_invalidate(self):
+        other = Snack.objects.create(name="Athirasam", selling_price=Decimal("40"))
+        self.assertEqual(self.names(), ["Athirasam", "Murukku"])
+
+        self.snack.soft_delete()
+        self.assertEqual(self.names(), ["Athirasam"])
+
+        with self.captureOnCommitCallbacks(execute=True):
+            other.delete()
+        self.assertEqual(self.names(), [])
+
+
+class RegionsCacheTests(SnackTestCase):
+    url = "/api/snacks/snacks/regions/"
+
+    def regions(self):
+        return [region["value"] for region in self.client.get(self.url).json()]
+
+    def test_hit_runs_only_the_stamp_query(self):
+        self.regions()
+
+        with self.assertNumQueries(1):
+            self.assertEqual(self.regions(), ["other"])
+
+    def test_follows_the_stamp(self):
+        self.assertEqual(self.regions(), ["other"])
+
+        self.snack.region = "kerala"
+        self.snack.save()
+        self.assertEqual(self.regions(), ["kerala"])
+
+        self.snack.soft_delete()
+        self.assertEqual(self.regions(), [])
+
+
+# ======================================================
+# COMBO AVAILABILITY
+# ======================================================
+
+class ComboAvailabilityTests(SnackTestCase):
+    def setUp(self):
+        super().setUp()
+        self.combo = SnackCombo.objects.create(name="Tea Box", selling_price=Decimal("99"))
+        with self.captureOnCommitCallbacks(execute=True):
+            SnackComboItem.objects.create(combo=self.combo, snack=self.snack, quantity=2)
+
+    def snacks_available(self):
+        self.combo.refresh_from_db(fields=["snacks_available"])
+        return self.combo.snacks_available
+
+    def test_follows_stock_and_activity(self):
+        self.assertFalse(self.snacks_available())
+
+        self.receive_batch()
+        self.assertTrue(self.snacks_available())
+
+        with self.captureOnCommitCallbacks(execute=True):
+            self.snack.soft_delete()
+        self.assertFalse(self.snacks_available())
+
+
+# ======================================================
+# COMBO ITEMS
+# ======================================================
+
+class ComboItemDisplayTextTests(SnackTestCase):
+    url = "/api/snacks/combos/"
+
+    def setUp(self):
+        super().setUp()
+        self.snack.pack_size = "200g"
+        self.snack.save()
+        self.receive_batch()
+        self.combo = SnackCombo.objects.create(name="Tea Box", selling_price=Decimal("99"))
+        self.item = SnackComboItem.objects.create(combo=self.combo, snack=self.snack, quantity=2)
+
+    def display_texts(self):
+        combos = self.client.get(self.url).json()
+        return [item["display_text"] for combo in combos for item in combo["items"]]
+
+    def test_renders_quantity_name_and_pack_size(self):
+        self.assertEqual(self.display_texts(), ["2 Murukku (200g)"])
+
+    def test_follows_queryset_updates(self):
+        Snack.objects.filter(pk=self.snack.pk).update(name="Thenkuzhal", pack_size="")
+        SnackComboItem.objects.filter(pk=self.item.pk).update(quantity=3)
+
+        self.assertEqual(self.display_texts(), ["3 Thenkuzhal"])
+
+
+# ======================================================
+# ADMIN
+# ======================================================
+
+class AdminTestCase(SnackTestCase):
+    def setUp(self):
+        super().setUp()
+        self.admin = get_user_model().objects.create_superuser(
+            username="admin", email="admin@example.com", password=None
+        )
+        self.client.force_login(self.admin)
+
+
+class DeferringChangeListTests(AdminTestCase):
+    def test_snack_list_defers_text_columns(self):
+        response = self.client.get("/admin/snacks/snack/")
+
+        self.assertEqual(response.status_code, 200)
+        row = response.context["cl"].result_list[0]
+        self.assertEqual(
+            row.get_deferred_fields(), {"description", "offers", "pairs_with"}
+        )
+
+    def test_change_form_loads_full_row(self):
+        response = self.client.get(f"/admin/snacks/snack/{self.snack.pk}/change/")
+
+        self.assertEqual(response.status_code, 200)
+        self.assertEqual(response.context["original"].get_deferred_fields(), set())
+
+
+class EstimatedCountPaginatorTests(SnackTestCase):
+    def setUp(self):
+        super().setUp()
+        Snack.objects.create(name="Athirasam", selling_price=Decimal("40"), is_active=False)
+
+    def test_small_or_filtered_tables_count_exactly(self):
+        for qs, expected in (
+            (Snack.objects.all(), 2),
+            (Snack.objects.filter(is_active=True), 1),
+        ):
+            with self.subTest(query=str(qs.query)):
+                self.assertEqual(EstimatedCountPaginator(qs, 25).count, expected)
+
+    @unittest.skipUnless(connection.vendor == "postgresql", "reads pg_class.reltuples")
+    def test_large_unfiltered_table_reads_the_planner_estimate(self):
+        with connection.cursor() as cursor:
+            cursor.execute("ANALYZE snacks_snack")
+
+        with mock.patch.object(EstimatedCountPaginator, "ESTIMATE_THRESHOLD", 0):
+            with CaptureQueriesContext(connection) as queries:
+                count = EstimatedCountPaginator(Snack.objects.all(), 25).count
+
+        self.assertEqual(count, 2)
+        self.assertFalse(any("COUNT(" in q["sql"] for q in queries.captured_queries))
+
+
+class SnackBatchAdminTests(AdminTestCase):
+    url = "/admin/snacks/snackbatch/"
+
+    def changelist_queries(self):
+        with CaptureQueriesContext(connection) as queries:
+            response = self.client.get(self.url)
+        self.assertEqual(response.status_code, 200)
+        return len(queries)
+
+    def test_changelist_query_count_does_not_grow_with_rows(self):
+        self.receive_batch()
+        baseline = self.changelist_queries()
+
+        for name in ("Athirasam", "Seedai", "Thattai"):
+            self.receive_batch(Snack.objects.create(name=name, selling_price=Decimal("40")))
+
+        self.assertEqual(self.changelist_queries(), baseline)
+
+    def test_changelist_defers_batch_notes(self):
+        self.receive_batch()
+
+        response = self.client.get(self.url)
+
+        row = response.context["cl"].result_list[0]
+        self.assertIn("notes", row.get_deferred_fields())
+        self.assertIn("description", row.snack.get_deferred_fields())
+
+    def test_add_form_uses_raw_id_snack_input(self):
+        response = self.client.get(f"{self.url}add/")
+
+        self.assertEqual(response.status_code, 200)
+        self.assertContains(response, "vForeignKeyRawIdAdminField")
+        self.assertNotContains(response, '<select name="snack"')
+
+
+# ======================================================
+# DATA MIGRATIONS
+# ======================================================
+
+class BackfillSnacksAvailableMigrationTests(MigrationTestCase):
+    app = "snacks"
+    migrate_from = "0014_snack_active_region_index"
+    migrate_to = "0015_snackcombo_snacks_available"
+
+    def seed(self, apps):
+        Snack = apps.get_model("snacks", "Snack")
+        SnackCombo = apps.get_model("snacks", "SnackCombo")
+        SnackComboItem = apps.get_model("snacks", "SnackComboItem")
+
+        stocked = Snack.objects.create(name="Murukku", selling_price=Decimal("50"), stock_qty=5)
+        empty = Snack.objects.create(name="Athirasam", selling_price=Decimal("40"))
+
+        self.ready = SnackCombo.objects.create(name="Ready", selling_price=Decimal("99"))
+        self.short = SnackCombo.objects.create(name="Short", selling_price=Decimal("99"))
+        SnackComboItem.objects.create(combo=self.ready, snack=stocked, quantity=1)
+        SnackComboItem.objects.create(combo=self.short, snack=stocked, quantity=1)
+        SnackComboItem.objects.create(combo=self.short, snack=empty, quantity=1)
+
+    def test_flags_combos_with_unavailable_snacks(self):
+        SnackCombo = self.apps.get_model("snacks", "SnackCombo")
+        available = dict(SnackCombo.objects.values_list("pk", "snacks_available"))
 
-# Create your tests here.
+        self.assertEqual(available, {self.ready.pk: True, self.short.pk: False})
@@ -1,12 +1,82 @@
+import hashlib
+
+from django.core.cache import cache
+from django.db.models import Max, OuterRef, Prefetch
 from rest_framework.viewsets import ReadOnlyModelViewSet
 from rest_framework.decorators import action
 from rest_framework.response import Response
+from rest_framework.settings import api_settings
 
-from .models import Snack, SnackCombo
-from .serializers import SnackSerializer, SnackComboSerializer
+from core.renderers import FastJSONRenderer
 
+from .models import (
+    Snack,
+    SnackCombo,
+    SnackComboItem,
+    next_expiry,
+    snack_profit,
+)
+from .serializers import SnackSerializer, SnackMinimalSerializer, SnackComboSerializer
 
 
+# ======================================================
+# LIST CACHE KEYS
+# ======================================================
+SNACK_LIST_CACHE_TIMEOUT = 60 * 5
+
+# Bumped after every committed Snack delete (see snacks.signals)
+CATALOG_DELETES_KEY = "snacks:catalog:deletes"
+
+# Columns SnackSerializer reads: its model fields plus `image` (image_url /
+# thumbnail_url). Cost, audit and internal columns stay in the database;
+# profit comes from the snack_profit() annotation.
+SNACK_LIST_COLUMNS = (
+    "id",
+    "uuid",
+    "is_active",
+    "name",
+    "description",
+    "category",
+    "region",
+    "image",
+    "animated_image",
+    "weight_label",
+    "pack_size",
+    "selling_price",
+    "mrp",
+    "min_order_qty",
+    "offers",
+    "is_best_buy",
+    "badge_text",
+    "stock_qty",
+    "is_veg",
+    "is_spicy",
+    "is_featured",
+    "pairs_with",
+)
+
+
+def catalog_stamp():
+    """
+    "<latest updated_at>:<latest stock_synced_at>:<delete count>" over ALL
+    snacks.
+
+    Any save or deactivation moves updated_at, a stock sync
+    (derived_columns) moves stock_synced_at, and a delete bumps the
+    counter, so keys built from it never go stale. Both maxima are
+    indexed, so this stays two index probes however large the table is.
+    """
+    stamp = Snack.objects.aggregate(m=Max("updated_at"), s=Max("stock_synced_at"))
+    return ":".join(
+        str(v.isoformat() if hasattr(v, "isoformat") else v)
+        for v in (stamp["m"], stamp["s"], cache.get(CATALOG_DELETES_KEY, 0))
+    )
+
+
+def snack_list_cache_key(request, stamp):
+    # Scheme + host are part of the payload (absolute image URLs)
+    raw = f"{request.scheme}://{request.get_host()}|{request.query_params.urlencode()}|{stamp}"
+    return "snacks:list:" + hashlib.md5(raw.encode()).hexdigest()
 
 
 # ======================================================
@@ -26,6 +96,18 @@ class SnackViewSet(ReadOnlyModelViewSet):
     """
 
     serializer_class = SnackSerializer
+    # Preferred for JSON; the configured default renderers stay negotiable
+    renderer_classes = (FastJSONRenderer, *api_settings.DEFAULT_RENDERER_CLASSES)
+
+    def is_minimal(self):
+        return self.request.query_params.get("minimal") in ("1", "true")
+
+    def get_serializer_class(self):
+        # ?minimal=1 → primitive columns only: no image URLs, no per-row
+        # batch lookups
+        if self.is_minimal():
+            return SnackMinimalSerializer
+        return SnackSerializer
 
     def get_queryset(self):
         queryset = (
@@ -34,6 +116,15 @@ class SnackViewSet(ReadOnlyModelViewSet):
             .order_by("name")
         )
 
+        if self.is_minimal():
+            queryset = queryset.only(*SnackMinimalSerializer.Meta.fields)
+        else:
+            # expiry_date and profit for every row in the same SELECT
+            queryset = queryset.only(*SNACK_LIST_COLUMNS).annotate(
+                next_expiry=next_expiry(OuterRef("pk")),
+                profit=snack_profit(),
+            )
+
         # Optional: featured snacks
         featured = self.request.query_params.get("featured")
         if featured == "true":
@@ -46,30 +137,50 @@ class SnackViewSet(ReadOnlyModelViewSet):
 
         return queryset
 
+    def list(self, request, *args, **kwargs):
+        # Read-heavy, global and rarely changing: one aggregate query on a
+        # hit instead of the queryset + serializer
+        key = snack_list_cache_key(request, catalog_stamp())
+        data = cache.get(key)
+
+        if data is None:
+            data = super().list(request, *args, **kwargs).data
+            cache.set(key, data, SNACK_LIST_CACHE_TIMEOUT)
+
+        return Response(data)
+
     @action(detail=False, methods=["get"])
     def regions(self, request):
         """
         Get available regions for filtering.
         Returns regions that have active snacks.
         """
-        regions = (
-            Snack.objects
-            .filter(is_active=True)
-            .values_list('region', flat=True)
-            .distinct()
-            .order_by('region')
+        def compute():
+            regions = (
+                Snack.objects
+                .filter(is_active=True)
+                .values_list('region', flat=True)
+                .distinct()
+                .order_by('region')
+            )
+
+            # Convert to display names
+            region_display_map = dict(Snack.REGION_CHOICES)
+            return [
+                {
+                    "value": region,
+                    "label": region_display_map.get(region, region.title())
+                }
+                for region in regions
+            ]
+
+        # Same staleness rule as the list: keyed on the catalogue stamp
+        result = cache.get_or_set(
+            f"snacks:regions:{catalog_stamp()}",
+            compute,
+            SNACK_LIST_CACHE_TIMEOUT,
         )
 
-        # Convert to display names
-        region_display_map = dict(Snack.REGION_CHOICES)
-        result = [
-            {
-                "value": region,
-                "label": region_display_map.get(region, region.title())
-            }
-            for region in regions
-        ]
-
         return Response(result)
 
 
@@ -87,12 +198,31 @@ class SnackComboViewSet(ReadOnlyModelViewSet):
     """
 
     serializer_class = SnackComboSerializer
+    renderer_classes = (FastJSONRenderer, *api_settings.DEFAULT_RENDERER_CLASSES)
 
     def get_queryset(self):
         queryset = (
             SnackCombo.objects
             .filter(is_active=True)
-            .prefetch_related("items__snack")
+            # Items and their snacks in one JOINed query, narrowed to what
+            # SnackComboItemSerializer / total_items read
+            .prefetch_related(
+                Prefetch(
+                    "items",
+                    queryset=(
+                        SnackComboItem.objects
+                        .select_related("snack")
+                        .only(
+                            "id",
+                            "combo_id",
+                            "quantity",
+                            "snack__id",
+                            "snack__name",
+                            "snack__pack_size",
+                        )
+                    ),
+                )
+            )
             .order_by("name")
         )
 
@@ -6,17 +6,19 @@ Run this after restarting Django.
 
 import os
 import sys
-import django
 
-# Setup Django
+# Settings only: the lazy settings object loads backend.settings on first
+# access without django.setup(), so no app, model or ready() is imported
+sys.path.insert(0, os.path.dirname(os.path.abspath(__file__)))
 os.environ.setdefault('DJANGO_SETTINGS_MODULE', 'backend.settings')
-django.setup()
 
 from django.conf import settings
 
-print("\n" + "="*70)
+SEP = "=" * 70
+
+print("\n" + SEP)
 print("CORS CONFIGURATION VERIFICATION")
-print("="*70)
+print(SEP)
 
 # Check CORS middleware
 middleware_list = settings.MIDDLEWARE
@@ -31,21 +33,23 @@ print(f"✓ CORS_ALLOW_CREDENTIALS: {settings.CORS_ALLOW_CREDENTIALS}")
 
 # Check custom header
 cors_headers = getattr(settings, 'CORS_ALLOW_HEADERS', [])
-idempotency_allowed = 'x-idempotency-key' in [h.lower() for h in cors_headers]
+# Header names are case-insensitive: fold once, reuse for every check
+allowed_headers = frozenset(h.casefold() for h in cors_headers)
+idempotency_allowed = 'x-idempotency-key' in allowed_headers
 
 print(f"\n✓ CORS_ALLOW_HEADERS configured: {bool(cors_headers)}")
 print(f"✓ x-idempotency-key allowed: {idempotency_allowed}")
 
 if cors_headers:
     print(f"\n  Headers allowed:")
-    for h in sorted(cors_headers):
+    for h in sorted(allowed_headers):
         print(f"    - {h}")
 
 # Check allowed origins
 allowed_origins = getattr(settings, 'CORS_ALLOWED_ORIGINS', [])
 print(f"\n✓ CORS_ALLOWED_ORIGINS: {allowed_origins if allowed_origins else '(DEBUG=True, all origins allowed)'}")
 
-print("\n" + "="*70)
+print("\n" + SEP)
 if cors_middleware_installed and idempotency_allowed:
     print("✅ CORS configuration is CORRECT")
     print("\nYou can now:")
@@ -55,4 +59,4 @@ if cors_middleware_installed and idempotency_allowed:
 else:
     print("❌ CORS configuration is INCOMPLETE")
 
-print("="*70 + "\n")
+print(SEP + "\n")
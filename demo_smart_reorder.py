@@ -7,9 +7,23 @@ Shows how the feature works end-to-end
 import json
 import os
 
+try:
+    import orjson
+except Exception:
+    orjson = None
+
+SEP = "=" * 50
+
+
+def pretty_json(data):
+    # orjson when installed; same 2-space layout as json.dumps(indent=2)
+    if orjson is not None:
+        return orjson.dumps(data, option=orjson.OPT_INDENT_2).decode()
+    return json.dumps(data, indent=2)
+
 def demo_smart_reorder():
     print("🔁 Smart Re-Order Feature Demo")
-    print("=" * 50)
+    print(SEP)
 
     # Simulate what happens when a user places an order
     print("\n1. User places an order...")
@@ -32,7 +46,7 @@ def demo_smart_reorder():
     }
 
     print("Order saved to localStorage:")
-    print(json.dumps(mock_order, indent=2))
+    print(pretty_json(mock_order))
 
     # Simulate what the SmartReOrder component shows
     print("\n2. Next time user visits, Smart Re-Order appears:")
@@ -0,0 +1,37 @@
+"""
+One-time Django setup shared by the maintenance / check scripts.
+
+    from _django_bootstrap import setup
+    setup()
+
+setup() is idempotent: the app registry is built once per interpreter, so
+scripts run back to back through runner.py pay the startup cost only once.
+To see where that startup time goes: python -X importtime <script>.
+"""
+
+import os
+import sys
+
+ROOT = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+BACKEND_DIR = os.path.join(ROOT, 'backend')
+
+_DONE = False
+
+
+def setup():
+    global _DONE
+    if _DONE:
+        return
+
+    # `backend.settings` and the apps live under backend/, whatever the cwd
+    if BACKEND_DIR not in sys.path:
+        sys.path.insert(0, BACKEND_DIR)
+    os.environ.setdefault('DJANGO_SETTINGS_MODULE', 'backend.settings')
+
+    import django
+    from django.apps import apps
+
+    # Already configured by someone else (e.g. manage.py shell)
+    if not apps.ready:
+        django.setup()
+    _DONE = True
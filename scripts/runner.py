@@ -0,0 +1,41 @@
+#!/usr/bin/env python
+"""
+Run several Django scripts in one interpreter so django.setup() runs once.
+
+    python scripts/runner.py scripts/check_admin_combo.py backend/verify_cors.py
+
+Each script runs as __main__; a sys.exit() inside one ends that script only.
+Exits non-zero if any script failed.
+"""
+
+import runpy
+import sys
+import traceback
+
+from _django_bootstrap import setup
+
+
+def run(paths):
+    setup()
+    failed = []
+    for path in paths:
+        print(f"\n>>> {path}")
+        try:
+            runpy.run_path(path, run_name='__main__')
+        except SystemExit as e:
+            if e.code not in (None, 0):
+                failed.append(path)
+        except Exception:
+            traceback.print_exc()
+            failed.append(path)
+
+    if failed:
+        print("\nFailed:", ", ".join(failed))
+    return 1 if failed else 0
+
+
+if __name__ == '__main__':
+    if len(sys.argv) < 2:
+        print("usage: runner.py SCRIPT [SCRIPT ...]")
+        sys.exit(2)
+    sys.exit(run(sys.argv[1:]))
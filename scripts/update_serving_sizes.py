@@ -1,15 +1,34 @@
 import os
+import sys
 from decimal import Decimal
-os.environ.setdefault('DJANGO_SETTINGS_MODULE', 'backend.settings')
-import django
-django.setup()
+sys.path.insert(0, os.path.dirname(os.path.abspath(__file__)))
+from _django_bootstrap import setup
+setup()
+from django.db import transaction
+from django.db.models import Case, Value, When
 from menu.models import PreparedItem
-names = ['Coconut Chutney', 'Peanut Chutney', 'Onion Tomato Chutney']
-for name in names:
-    try:
-        p = PreparedItem.objects.get(name=name)
-        p.serving_size = Decimal('35')
-        p.save()
-        print(f"Updated {name} id={p.id} serving_size={p.serving_size}")
-    except PreparedItem.DoesNotExist:
+# name -> serving size
+SERVING_SIZES = {
+    'Coconut Chutney': Decimal('35'),
+    'Peanut Chutney': Decimal('35'),
+    'Onion Tomato Chutney': Decimal('35'),
+}
+sizes = set(SERVING_SIZES.values())
+if len(sizes) == 1:
+    new_size = sizes.pop()
+else:
+    # Different sizes still go out as one UPDATE ... SET = CASE name ...
+    new_size = Case(
+        *[When(name=name, then=Value(size)) for name, size in SERVING_SIZES.items()],
+        output_field=PreparedItem._meta.get_field('serving_size'),
+    )
+# One SELECT (for reporting) + one UPDATE of the single column, one commit
+with transaction.atomic():
+    qs = PreparedItem.objects.filter(name__in=SERVING_SIZES)
+    found = dict(qs.values_list('name', 'id'))
+    qs.update(serving_size=new_size)
+for name, serving_size in SERVING_SIZES.items():
+    if name in found:
+        print(f"Updated {name} id={found[name]} serving_size={serving_size}")
+    else:
         print(f"PreparedItem not found: {name}")
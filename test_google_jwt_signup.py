@@ -1,60 +1,102 @@
 #!/usr/bin/env python3
 """
 Test Google JWT signup flow
+
+Runs against every port in PORTS (default: 8012,8013), e.g.
+    PORTS=8013 python test_google_jwt_signup.py
 """
+from concurrent.futures import ThreadPoolExecutor
+import io
+import os
+import sys
+
 import requests
+from requests.adapters import HTTPAdapter
 import json
 
-BASE_URL = 'http://127.0.0.1:8012'
+PORTS = os.environ.get('PORTS', '8012,8013')
+SEP = '=' * 60
+
+# Fixed request bodies, encoded once and reused for every run/port
+JSON_HEADERS = {'Content-Type': 'application/json'}
+FIREBASE_BODY = json.dumps({'id_token': 'google-jwt-token-here'}).encode()
+JWT_CREATE_BODY = json.dumps({'username': 'test', 'password': 'test'}).encode()
 
-def test_status():
+# One pooled keep-alive connection shared by every probe
+SESSION = requests.Session()
+SESSION.mount('http://', HTTPAdapter(pool_connections=2, pool_maxsize=8, max_retries=0))
+
+def test_status(base_url, out=None):
     """Test status endpoint"""
-    print('1. Testing status endpoint...')
+    print('1. Testing status endpoint...', file=out)
     try:
-        r = requests.get(f'{BASE_URL}/api/status/')
-        print(f'   Status: {r.status_code}')
-        print(f'   Response: {r.json()}')
+        # Liveness only: HEAD skips the body on the wire and the JSON parse
+        r = SESSION.head(f'{base_url}/api/status/', timeout=5)
+        print(f'   ✓ Status: {r.status_code}', file=out)
         return r.status_code == 200
     except Exception as e:
-        print(f'   Error: {e}')
+        print(f'   ✗ Error: {e}', file=out)
         return False
 
-def test_google_jwt_firebase():
+def test_google_jwt_firebase(base_url, out=None):
     """Test Google JWT Firebase endpoint"""
-    print('\n2. Testing Google JWT Firebase endpoint...')
+    print('\n2. Testing Google JWT Firebase endpoint...', file=out)
     try:
-        r = requests.post(f'{BASE_URL}/api/auth/jwt/firebase/', json={'id_token': 'google-jwt-token-here'})
-        print(f'   Status: {r.status_code}')
-        print(f'   Response: {r.json()}')
+        r = SESSION.post(f'{base_url}/api/auth/jwt/firebase/', data=FIREBASE_BODY, headers=JSON_HEADERS, timeout=5)
+        print(f'   ✓ Status: {r.status_code}', file=out)
+        print(f'   Response: {r.json()}', file=out)
         return r.status_code == 200
     except Exception as e:
-        print(f'   Error: {e}')
+        print(f'   ✗ Error: {e}', file=out)
         return False
 
-def test_standard_jwt():
+def test_standard_jwt(base_url, out=None):
     """Test standard JWT create endpoint"""
-    print('\n3. Testing standard JWT create endpoint...')
+    print('\n3. Testing standard JWT create endpoint...', file=out)
     try:
-        r = requests.post(f'{BASE_URL}/api/auth/jwt/create/', json={'username': 'test', 'password': 'test'})
-        print(f'   Status: {r.status_code}')
-        print(f'   Response: {r.json() if r.status_code == 200 else r.text[:200]}')
+        r = SESSION.post(f'{base_url}/api/auth/jwt/create/', data=JWT_CREATE_BODY, headers=JSON_HEADERS, timeout=5)
+        print(f'   Status: {r.status_code}', file=out)
+        print(f'   Response: {r.json() if r.status_code == 200 else r.text[:200]}', file=out)
         return r.status_code in [200, 401]
     except Exception as e:
-        print(f'   Error: {e}')
+        print(f'   ✗ Error: {e}', file=out)
         return False
 
-if __name__ == '__main__':
-    print('Testing Google JWT Signup Flow')
-    print('=' * 50)
-    
-    results = {
-        'status': test_status(),
-        'google_jwt': test_google_jwt_firebase(),
-        'standard_jwt': test_standard_jwt(),
-    }
-    
-    print('\n' + '=' * 50)
-    print('Results:')
+def run_suite(base_url):
+    """Run all probes against one server; returns {probe name: passed}"""
+    print(f'Testing Google JWT Signup Flow ({base_url})')
+    print(SEP)
+
+    # Independent, network-bound probes: run them together so the wall time
+    # is the slowest probe, not the sum (SESSION is shared across threads)
+    probes = [
+        ('status', test_status),
+        ('google_jwt', test_google_jwt_firebase),
+        ('standard_jwt', test_standard_jwt),
+    ]
+    # Each probe prints into its own buffer: output stays in probe order
+    # and goes out in a single write instead of one per line
+    bufs = {name: io.StringIO() for name, _ in probes}
+    with ThreadPoolExecutor(max_workers=len(probes)) as ex:
+        futs = {name: ex.submit(fn, base_url, bufs[name]) for name, fn in probes}
+        results = {name: f.result() for name, f in futs.items()}
+
+    out = io.StringIO()
+    for buf in bufs.values():
+        out.write(buf.getvalue())
+    print('\n' + SEP, file=out)
+    print('Results Summary:', file=out)
     for test_name, passed in results.items():
-        status = '✓' if passed else '✗'
-        print(f'  {status} {test_name}')
+        status = '✓ PASS' if passed else '✗ FAIL'
+        print(f'  {status:8} - {test_name}', file=out)
+
+    all_passed = all(results.values())
+    print('\n' + ('✓ All tests passed!' if all_passed else '✗ Some tests failed'), file=out)
+    sys.stdout.write(out.getvalue())
+    sys.stdout.flush()
+    return results
+
+if __name__ == '__main__':
+    for port in PORTS.split(','):
+        run_suite(f'http://127.0.0.1:{port.strip()}')
+        print()
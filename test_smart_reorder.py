@@ -4,16 +4,19 @@ Test Smart Re-Order Feature
 """
 import os
 import sys
-import django
 
-# Setup Django
-sys.path.insert(0, os.path.join(os.path.dirname(__file__), 'backend'))
-os.environ.setdefault('DJANGO_SETTINGS_MODULE', 'backend.settings')
-django.setup()
+# Setup Django (shared, runs once per interpreter)
+sys.path.insert(0, os.path.join(os.path.dirname(os.path.abspath(__file__)), 'scripts'))
+from _django_bootstrap import setup
+setup()
 
+from django.db import connection
 from django.test.client import Client
+from django.test.utils import CaptureQueriesContext
 from core.models import BreakfastWindow
 
+SEP = "=" * 50
+
 def test_breakfast_window_api():
     """Test that the breakfast window API works"""
     client = Client()
@@ -30,10 +33,12 @@ def test_breakfast_window_api():
 
         # Verify required fields
         required_fields = ['is_open', 'status_label', 'status_message', 'opens_at', 'closes_at', 'next_open_at']
+        missing = set(required_fields) - data.keys()
         for field in required_fields:
-            if field in data:
+            if field not in missing:
                 print(f"✓ {field}: {data[field]}")
-            else:
+        for field in required_fields:
+            if field in missing:
                 print(f"✗ Missing field: {field}")
     else:
         print(f"API Error: {response.content}")
@@ -41,22 +46,27 @@ def test_breakfast_window_api():
 def test_breakfast_window_model():
     """Test that the BreakfastWindow model works"""
     try:
-        # Get the breakfast window
-        bw = BreakfastWindow.objects.first()
-        if bw:
-            print(f"BreakfastWindow exists: {bw}")
-            print(f"Is open now: {bw.is_open_now}")
-            status = bw.get_current_status()
-            print(f"Status: {status}")
-        else:
-            print("No BreakfastWindow found")
+        with CaptureQueriesContext(connection) as ctx:
+            # Get the breakfast window
+            bw = BreakfastWindow.objects.first()
+            if bw:
+                print(f"BreakfastWindow exists: {bw}")
+                print(f"Is open now: {bw.is_open_now}")
+                # Reuse the loaded row when it is the active one
+                status = BreakfastWindow.get_current_status(
+                    window=bw if bw.is_active else None
+                )
+                print(f"Status: {status}")
+            else:
+                print("No BreakfastWindow found")
+        print(f"Queries: {len(ctx.captured_queries)}")
 
     except Exception as e:
         print(f"Model test failed: {e}")
 
 if __name__ == '__main__':
     print("Testing Smart Re-Order Backend Integration...")
-    print("=" * 50)
+    print(SEP)
 
     test_breakfast_window_model()
     print()
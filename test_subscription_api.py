@@ -13,8 +13,10 @@ django.setup()
 from menu.models import SubscriptionPlan
 
 print("Testing subscription plans from database:")
-plans = SubscriptionPlan.objects.filter(is_active=True)
-print(f"Found {plans.count()} active subscription plans:")
+# One SELECT: count from the fetched list, not a separate COUNT(*);
+# get_discounted_price() is plain arithmetic on the row
+plans = list(SubscriptionPlan.objects.filter(is_active=True))
+print(f"Found {len(plans)} active subscription plans:")
 for plan in plans:
     print(f"- {plan.name}: ₹{plan.base_price} ({plan.plan_type})")
     print(f"  Discounted price: ₹{plan.get_discounted_price(30)}")